@@ -0,0 +1,108 @@
+"""Memoized results of mapper reads bounded by size in bytes.
+
+Results are keyed by the node path, the write version of the mapper, the
+read method and its normalized arguments. Every write through a mapper
+bumps its version and drops cached results of the node. Cached arrays are
+returned read-only and are shared between callers, so they are never
+copied. Writes made by other processes are not tracked.
+"""
+from __future__ import annotations
+
+import collections
+import typing as ty
+
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule('numpy')
+
+
+__all__ = [
+    'CacheStats',
+    'ResultCache',
+]
+
+
+CacheKey = ty.Tuple[str, int, str, ty.Tuple[ty.Any, ...]]
+
+
+class CacheStats(ty.NamedTuple):
+    """Statistics of a result cache."""
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Return share of reads served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """LRU cache of read results bounded by size in bytes."""
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the cache.
+
+        :param max_size: maximal total size of cached arrays in bytes
+        """
+        self._max_size = max_size
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._entries: ty.OrderedDict[CacheKey, np.ndarray] = \
+            collections.OrderedDict()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Return hits, misses, count and size of cached results."""
+        return CacheStats(self._hits, self._misses, len(self._entries),
+                          self._size)
+
+    def get(self,
+            key: CacheKey,
+            read: ty.Callable[[], ty.Any]) -> ty.Any:
+        """Return cached result for the key or read and cache it.
+
+        :param key: node path, write version, method name and arguments
+        :param read: function reading the result on a cache miss
+        """
+        if key in self._entries:
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self._misses += 1
+        result = read()
+        cacheable = isinstance(result, np.ndarray) and \
+            result.nbytes <= self._max_size
+        if not cacheable:
+            return result
+        result.flags.writeable = False
+        self._entries[key] = result
+        self._size += result.nbytes
+        while self._size > self._max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+        return result
+
+    def invalidate(self, node_path: str) -> None:
+        """Drop cached results of the node.
+
+        :param node_path: full path of the node
+        """
+        for key in [key for key in self._entries if key[0] == node_path]:
+            self._size -= self._entries.pop(key).nbytes
+
+    def clear(self) -> None:
+        """Drop all cached results and reset statistics."""
+        self._entries.clear()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
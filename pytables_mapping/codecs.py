@@ -0,0 +1,413 @@
+"""Per-column storage codecs for Table mappers.
+
+Codecs are declared with the COLUMN_CODECS attribute of a Table subclass
+and are applied transparently: values are encoded on append and decoded on
+read. Conditions of ``read_where`` are evaluated against stored values, so
+they may refer only to plain columns and columns of QUERYABLE codecs, whose
+stored values are equal to the column values. Encoding has no side effects,
+state of codecs (dictionaries, delta anchors) is saved by ``commit`` only
+after the encoded rows are written.
+
+Every column of a Table is stored in a single HDF5 dataset, so shuffle
+hints of codecs can not be applied per column. They are resolved into the
+table filters instead: bit shuffle if any codec asks for it, byte shuffle
+otherwise. HDF5 applies shuffle only with compression, so the table filters
+must be compressed.
+"""
+from __future__ import annotations
+
+import typing as ty
+
+from pytables_mapping import consts
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+    import tables as tb
+else:
+    np = LazyModule('numpy')
+    tb = LazyModule('tables')
+
+
+__all__ = [
+    'ColumnCodec',
+    'Delta',
+    'Dictionary',
+    'Downcast',
+    'shuffled_filters',
+    'storage_dtype',
+]
+
+
+SHUFFLES = (None, 'byte', 'bit')
+
+
+class ColumnCodec:
+    """Base class for column codecs, stores values as they are."""
+
+    # stored values are equal to the column values, so conditions of
+    # read_where on the column are valid on stored values
+    QUERYABLE: bool = True
+
+    def __init__(self, shuffle: ty.Optional[str] = None) -> None:
+        """Initialize the codec.
+
+        :param shuffle: 'byte' or 'bit' shuffle preferred for the column
+        """
+        if shuffle not in SHUFFLES:
+            raise ValueError(f'Unknown shuffle {shuffle!r}')
+        self.shuffle = shuffle
+
+    def storage_dtype(self, dtype: np.dtype) -> np.dtype:
+        """Return dtype of stored values for column values of *dtype*."""
+        return dtype
+
+    def create(self, mapper: ty.Any, column: str) -> None:
+        """Create auxiliary nodes of the codec, if any."""
+
+    def remove(self, mapper: ty.Any, column: str) -> None:
+        """Remove auxiliary nodes of the codec, if any."""
+
+    def encode(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: int) -> np.ndarray:
+        """Encode values of rows appended at *start* row."""
+        return values
+
+    def commit(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: ty.Optional[int]) -> None:
+        """Save state of the codec after encoded values are written.
+
+        :param values: values of written rows
+        :param start: the first appended row, None for updated rows
+        """
+
+    def decode(self,
+               mapper: ty.Any,
+               column: str,
+               stored: np.ndarray,
+               start: int) -> np.ndarray:
+        """Decode stored values of contiguous rows beginning at *start*."""
+        return stored
+
+    def decode_rows(self,
+                    mapper: ty.Any,
+                    column: str,
+                    stored: np.ndarray,
+                    coords: np.ndarray) -> np.ndarray:
+        """Decode stored values of rows with the given coordinates."""
+        return self.decode(mapper, column, stored, 0)
+
+    def update(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               coords: np.ndarray) -> np.ndarray:
+        """Encode values that overwrite rows with the coordinates in place."""
+        return self.encode(mapper, column, values, 0)
+
+
+class Downcast(ColumnCodec):
+    """Store integers in the smallest type fitting the value range."""
+
+    def __init__(self,
+                 low: int,
+                 high: int,
+                 shuffle: ty.Optional[str] = None) -> None:
+        """Initialize the codec.
+
+        :param low: minimal possible value of the column
+        :param high: maximal possible value of the column
+        :param shuffle: 'byte' or 'bit' shuffle preferred for the column
+        """
+        super().__init__(shuffle)
+        self.low = low
+        self.high = high
+        self.dtype = np.result_type(np.min_scalar_type(low),
+                                    np.min_scalar_type(high))
+
+    def storage_dtype(self, dtype: np.dtype) -> np.dtype:
+        """Return the smallest integer dtype fitting the value range."""
+        return self.dtype
+
+    def encode(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: int) -> np.ndarray:
+        """Check the value range and downcast values."""
+        out_of_range = (values < self.low) | (values > self.high)
+        if out_of_range.any():
+            raise ValueError(f'Values of column {column} are out of range '
+                             f'[{self.low}, {self.high}]')
+        return values.astype(self.dtype)
+
+    def decode(self,
+               mapper: ty.Any,
+               column: str,
+               stored: np.ndarray,
+               start: int) -> np.ndarray:
+        """Cast values back to the column dtype."""
+        return stored.astype(mapper.dtype[column])
+
+
+class Dictionary(ColumnCodec):
+    """Store low-cardinality values as codes of a dictionary.
+
+    The dictionary is kept in the table node attrs and grows on append.
+    """
+
+    QUERYABLE = False
+
+    def __init__(self,
+                 size: int = 256,
+                 shuffle: ty.Optional[str] = None) -> None:
+        """Initialize the codec.
+
+        :param size: maximal count of distinct values
+        :param shuffle: 'byte' or 'bit' shuffle preferred for the column
+        """
+        super().__init__(shuffle)
+        self.size = size
+        self.dtype = np.min_scalar_type(size - 1)
+
+    def storage_dtype(self, dtype: np.dtype) -> np.dtype:
+        """Return the smallest unsigned dtype for codes."""
+        return self.dtype
+
+    def dictionary(self, mapper: ty.Any, column: str) -> np.ndarray:
+        """Return distinct values of the column in order of their codes."""
+        attrs = mapper.node._v_attrs
+        name = consts.CODEC_DICTIONARY_ATTR_PREFIX + column
+        if name in attrs:
+            return attrs[name]
+        return np.empty(0, dtype=mapper.dtype[column])
+
+    def encode(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: int) -> np.ndarray:
+        """Replace values by codes, new values get the next codes."""
+        unique, inverse = np.unique(values, return_inverse=True)
+        dictionary = self._extended(mapper, column, unique)
+        order = np.argsort(dictionary, kind='stable')
+        codes = order[np.searchsorted(dictionary[order], unique)]
+        return codes[inverse.reshape(-1)].astype(self.dtype)
+
+    def commit(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: ty.Optional[int]) -> None:
+        """Add new values to the dictionary."""
+        dictionary = self.dictionary(mapper, column)
+        extended = self._extended(mapper, column, np.unique(values))
+        if len(extended) > len(dictionary):
+            mapper.node._v_attrs[
+                consts.CODEC_DICTIONARY_ATTR_PREFIX + column] = extended
+
+    def _extended(self,
+                  mapper: ty.Any,
+                  column: str,
+                  unique: np.ndarray) -> np.ndarray:
+        """Return the dictionary with sorted unique values added."""
+        dictionary = self.dictionary(mapper, column)
+        missing = unique[~np.isin(unique, dictionary)]
+        if not missing.size:
+            return dictionary
+        dictionary = np.concatenate([dictionary, missing])
+        if len(dictionary) > self.size:
+            raise ValueError(f'Column {column} has more than '
+                             f'{self.size} distinct values')
+        return dictionary
+
+    def decode(self,
+               mapper: ty.Any,
+               column: str,
+               stored: np.ndarray,
+               start: int) -> np.ndarray:
+        """Replace codes by values of the dictionary."""
+        return self.dictionary(mapper, column)[stored]
+
+
+class Delta(ColumnCodec):
+    """Store differences between neighbour rows of (monotonic) columns.
+
+    Absolute values of every *block* row are kept in an auxiliary EArray
+    next to the table, so a range read decodes at most one extra block.
+    Values of delta encoded columns can not be changed in place.
+    """
+
+    QUERYABLE = False
+
+    def __init__(self,
+                 dtype: ty.Optional[ty.Any] = None,
+                 block: int = consts.DEFAULT_DELTA_BLOCK_ROWS,
+                 shuffle: ty.Optional[str] = None) -> None:
+        """Initialize the codec.
+
+        :param dtype: dtype of stored differences, the column dtype by
+            default
+        :param block: count of rows between stored absolute values
+        :param shuffle: 'byte' or 'bit' shuffle preferred for the column
+        """
+        super().__init__(shuffle)
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.block = block
+
+    def storage_dtype(self, dtype: np.dtype) -> np.dtype:
+        """Return dtype of stored differences."""
+        return dtype if self.dtype is None else self.dtype
+
+    def anchors_name(self, mapper: ty.Any, column: str) -> str:
+        """Return name of the node with absolute values of blocks."""
+        return f'{mapper.name}_{column}_anchors'
+
+    def anchors(self, mapper: ty.Any, column: str) -> 'tb.EArray':
+        """Return the node with absolute values of blocks."""
+        return mapper._store.get_node(
+            mapper.node._v_parent, self.anchors_name(mapper, column)
+        )
+
+    def create(self, mapper: ty.Any, column: str) -> None:
+        """Create the node for absolute values of blocks."""
+        mapper._store.create_earray(
+            mapper.node._v_parent,
+            self.anchors_name(mapper, column),
+            atom=tb.Atom.from_dtype(mapper.dtype[column]),
+            shape=(0, )
+        )
+
+    def remove(self, mapper: ty.Any, column: str) -> None:
+        """Remove the node for absolute values of blocks."""
+        mapper._store.remove_node(mapper.node._v_parent,
+                                  self.anchors_name(mapper, column))
+
+    def encode(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: int) -> np.ndarray:
+        """Replace values by differences with the previous row."""
+        if not values.size:
+            return values.astype(self.storage_dtype(values.dtype))
+        name = consts.CODEC_DELTA_LAST_ATTR_PREFIX + column
+        previous = mapper.node._v_attrs[name] if start else values[0]
+        deltas = np.diff(values, prepend=previous)
+        stored = deltas.astype(self.storage_dtype(values.dtype))
+        if not np.array_equal(stored, deltas):
+            raise ValueError(f'Differences of column {column} overflow '
+                             f'{stored.dtype}')
+        return stored
+
+    def commit(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               start: ty.Optional[int]) -> None:
+        """Save anchors of appended blocks and the last value."""
+        if start is None or not values.size:
+            return
+        first_anchor = -(-start // self.block) * self.block
+        anchor_rows = np.arange(first_anchor, start + len(values),
+                                self.block) - start
+        if anchor_rows.size:
+            self.anchors(mapper, column).append(values[anchor_rows])
+        mapper.node._v_attrs[
+            consts.CODEC_DELTA_LAST_ATTR_PREFIX + column] = values[-1]
+
+    def decode(self,
+               mapper: ty.Any,
+               column: str,
+               stored: np.ndarray,
+               start: int) -> np.ndarray:
+        """Restore values by the nearest anchor and cumulative sums."""
+        if not stored.size:
+            return stored.astype(mapper.dtype[column])
+        block_start = start // self.block * self.block
+        if block_start < start:
+            prefix = mapper.node.read(block_start, start, field=column)
+            stored = np.concatenate([prefix, stored])
+        dtype = mapper.dtype[column]
+        anchor = self.anchors(mapper, column)[start // self.block]
+        values = np.cumsum(stored, dtype=dtype)
+        values += anchor - values[0]
+        return values[start - block_start:]
+
+    def decode_rows(self,
+                    mapper: ty.Any,
+                    column: str,
+                    stored: np.ndarray,
+                    coords: np.ndarray) -> np.ndarray:
+        """Restore values of the given rows block by block."""
+        result = np.empty(len(coords), dtype=mapper.dtype[column])
+        blocks = coords // self.block
+        for block in np.unique(blocks):
+            start = int(block) * self.block
+            stop = min(start + self.block, mapper.nrows)
+            values = self.decode(
+                mapper, column,
+                mapper.node.read(start, stop, field=column), start
+            )
+            selected = blocks == block
+            result[selected] = values[coords[selected] - start]
+        return result
+
+    def update(self,
+               mapper: ty.Any,
+               column: str,
+               values: np.ndarray,
+               coords: np.ndarray) -> np.ndarray:
+        """Keep stored differences, refuse to change values in place.
+
+        A changed value would change the difference of the next row too.
+        """
+        stored = mapper.node.read_coordinates(coords, field=column)
+        if not np.array_equal(
+                self.decode_rows(mapper, column, stored, coords), values):
+            raise ValueError(f'Values of delta encoded column {column} '
+                             f'can not be changed in place')
+        return stored
+
+
+def storage_dtype(dtype: np.dtype,
+                  codecs: ty.Dict[str, ColumnCodec]) -> np.dtype:
+    """Return dtype of stored rows of a table with column codecs.
+
+    :param dtype: table description
+    :param codecs: codecs by column names
+    """
+    names = dtype.names or ()
+    unknown = set(codecs) - set(names)
+    if unknown:
+        raise ValueError(f'Codecs for unknown columns: {sorted(unknown)}')
+    return np.dtype([
+        (name, codecs[name].storage_dtype(dtype[name])
+         if name in codecs else dtype[name])
+        for name in names
+    ])
+
+
+def shuffled_filters(filters: ty.Optional['tb.Filters'],
+                     codecs: ty.Dict[str, ColumnCodec]
+                     ) -> ty.Optional['tb.Filters']:
+    """Apply shuffle hints of codecs to the table filters.
+
+    :param filters: table filters, compressed if there are shuffle hints
+    :param codecs: codecs by column names
+    """
+    hints = {codec.shuffle for codec in codecs.values()} - {None}
+    if not hints:
+        return filters
+    if filters is None or not filters.complevel:
+        raise ValueError('Shuffle hints of codecs require compressed '
+                         'table filters')
+    bitshuffle = 'bit' in hints
+    return filters.copy(shuffle=not bitshuffle, bitshuffle=bitshuffle)
@@ -1,6 +1,10 @@
-"""There are common constants for package."""
+"""There are common constants for package.
 
-import tables as tb
+Default filters are built on the first access, so importing the constants
+does not import PyTables.
+"""
+
+import typing as ty
 
 
 DEFAULT_CHUNKSHAPE = 100
@@ -16,12 +20,45 @@ DEFAULT_INDEX_COMPLEVEL = 3
 
 DEFAULT_COLUMNS_CHUNKSHAPE = (1000, )
 
-DEFAULT_DATA_FILTER = tb.Filters(
-    complevel=DEFAULT_DATA_COMPLEVEL,
-    complib=DEFAULT_DATA_COMPLIB
-)
+# DEFAULT_DATA_FILTER and DEFAULT_INDEX_FILTER, see __getattr__
+LAZY_FILTERS = {
+    'DEFAULT_DATA_FILTER': (DEFAULT_DATA_COMPLEVEL, DEFAULT_DATA_COMPLIB),
+    'DEFAULT_INDEX_FILTER': (DEFAULT_INDEX_COMPLEVEL, DEFAULT_INDEX_COMPLIB),
+}
+
+# write-ahead journal options
+DEFAULT_JOURNAL_SUFFIX = '.journal'
+REJECTED_JOURNAL_SUFFIX = '.rejected'
+DEFAULT_JOURNAL_COMMIT_SIZE = 64 * 1024 * 1024
+
+# node attribute prefix for persistent offsets of tail consumers
+TAIL_OFFSET_ATTR_PREFIX = 'TAIL_OFFSET_'
+
+# count of source rows parsed and appended at once by the bulk loader
+DEFAULT_BULK_CHUNK_ROWS = 100000
+# count of chunks in flight per worker process of bulk loads and merges
+BULK_CHUNKS_PER_PROCESS = 2
+
+# size of the in-memory build side of joins in bytes, larger build sides
+# are split into partitions in a scratch file
+DEFAULT_JOIN_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# column codecs options
+DEFAULT_DELTA_BLOCK_ROWS = 4096
+CODEC_DELTA_LAST_ATTR_PREFIX = 'CODEC_DELTA_LAST_'
+CODEC_DICTIONARY_ATTR_PREFIX = 'CODEC_DICTIONARY_'
+
+# attribute of primary key index nodes with the first rows of sorted runs
+PRIMARY_KEY_RUNS_ATTR = 'PRIMARY_KEY_RUNS'
+
+
+def __getattr__(name: str) -> ty.Any:
+    """Build default filters on the first access."""
+    if name not in LAZY_FILTERS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    import tables as tb
 
-DEFAULT_INDEX_FILTER = tb.Filters(
-    complevel=DEFAULT_INDEX_COMPLEVEL,
-    complib=DEFAULT_INDEX_COMPLIB
-)
+    complevel, complib = LAZY_FILTERS[name]
+    globals()[name] = tb.Filters(complevel=complevel, complib=complib)
+    return globals()[name]
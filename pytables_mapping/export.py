@@ -0,0 +1,176 @@
+"""Export of mapper data to shared memory and Arrow IPC without extra copies.
+
+Data is streamed from the node chunk by chunk: into a preallocated
+``multiprocessing.shared_memory`` segment, which other processes attach to
+as a numpy array, or into Arrow IPC record batches, which consumers can
+memory-map. PyArrow is an optional dependency required only for the Arrow
+export.
+"""
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+import typing as ty
+
+import numpy as np
+
+from pytables_mapping.mapping import BaseStoredObjectMapper
+from pytables_mapping.mapping import VLArray
+
+
+__all__ = [
+    'SharedArray',
+    'attach_shared_memory',
+    'arrow_schema',
+    'to_arrow_ipc',
+    'to_shared_memory',
+]
+
+
+class SharedArray(ty.NamedTuple):
+    """Picklable description of an array exported to shared memory."""
+
+    name: str
+    dtype: np.dtype
+    shape: ty.Tuple[int, ...]
+
+
+def _chunks(mapper: BaseStoredObjectMapper,
+            chunk_size: ty.Optional[int]) -> ty.Iterator[ty.Tuple[int, int]]:
+    nrows = mapper.nrows
+    chunk_size = chunk_size or mapper.chunk_rows
+    for start in range(0, nrows, chunk_size):
+        yield start, min(start + chunk_size, nrows)
+
+
+def to_shared_memory(
+        mapper: BaseStoredObjectMapper,
+        name: ty.Optional[str] = None,
+        chunk_size: ty.Optional[int] = None
+) -> ty.Tuple[shared_memory.SharedMemory, SharedArray]:
+    """Read all the node data into a new shared memory segment.
+
+    Chunks are decoded directly into the segment, so the data is never
+    held in the process memory twice. The caller owns the segment and must
+    ``close()`` and ``unlink()`` it when consumers are done.
+
+    :param mapper: the mapper to export, variable length arrays are not
+        supported
+    :param name: name of the shared memory segment, random by default
+    :param chunk_size: count of rows read at once, by default the chunk
+        size of the node
+    :rtype tuple: the segment and its description for consumers
+    """
+    if isinstance(mapper, VLArray):
+        raise TypeError('Variable length arrays can not be exported '
+                        'to shared memory')
+    node = mapper.node
+    assert node is not None
+    shape = (mapper.nrows, ) + tuple(node.shape[1:])
+    dtype = mapper.dtype
+    size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    out = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+    for start, stop in _chunks(mapper, chunk_size):
+        mapper._read_rows(start, stop, out=out[start:stop])
+    del out
+    return segment, SharedArray(segment.name, dtype, shape)
+
+
+def attach_shared_memory(
+        info: SharedArray
+) -> ty.Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Attach to exported data as a numpy array without copying it.
+
+    The returned array is valid while the segment is open, delete the
+    array before ``close()`` of the segment.
+
+    :param info: description returned by :func:`to_shared_memory`
+    :rtype tuple: the segment and the array backed by it
+    """
+    segment = shared_memory.SharedMemory(name=info.name)
+    return segment, np.ndarray(info.shape, dtype=info.dtype,
+                               buffer=segment.buf)
+
+
+def _import_pyarrow() -> ty.Any:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:
+        raise ImportError('Arrow export requires pyarrow package') from exc
+    return pa
+
+
+def _arrow_column(pa: ty.Any,
+                  column: ty.Any,
+                  atom_dtype: ty.Optional[np.dtype] = None) -> ty.Any:
+    if atom_dtype is not None:
+        # variable length rows
+        value_type = pa.from_numpy_dtype(atom_dtype.base)
+        return pa.array([np.asarray(row).reshape(-1) for row in column],
+                        type=pa.list_(value_type))
+    if not column.dtype.isnative:
+        column = column.astype(column.dtype.newbyteorder('='))
+    if column.ndim == 1:
+        return pa.array(column)
+    inner_size = int(np.prod(column.shape[1:]))
+    values = pa.array(np.ascontiguousarray(column).reshape(-1))
+    return pa.FixedSizeListArray.from_arrays(values, inner_size)
+
+
+def _record_batch(pa: ty.Any,
+                  mapper: BaseStoredObjectMapper,
+                  data: ty.Any) -> ty.Any:
+    fields = getattr(getattr(data, 'dtype', None), 'names', None)
+    if fields:
+        columns = [_arrow_column(pa, data[field]) for field in fields]
+        return pa.RecordBatch.from_arrays(columns, names=list(fields))
+    atom_dtype = None
+    if isinstance(mapper, VLArray):
+        assert mapper.node is not None
+        atom_dtype = mapper.node.atom.dtype
+    return pa.RecordBatch.from_arrays([_arrow_column(pa, data, atom_dtype)],
+                                      names=[mapper.name])
+
+
+def arrow_schema(mapper: BaseStoredObjectMapper) -> ty.Any:
+    """Return Arrow schema matching dtype of the mapper node.
+
+    Table fields become columns, other nodes become a single column named
+    after the mapper. Multidimensional items become fixed size lists.
+
+    :param mapper: the mapper to describe
+    :rtype pyarrow.Schema:
+    """
+    pa = _import_pyarrow()
+    return _record_batch(pa, mapper, mapper._read_rows(0, 0)).schema
+
+
+def to_arrow_ipc(mapper: BaseStoredObjectMapper,
+                 sink: ty.Any,
+                 chunk_size: ty.Optional[int] = None,
+                 stream: bool = False) -> int:
+    """Write the node data into Arrow IPC record batches chunk by chunk.
+
+    The file format lets consumers memory-map the result with
+    ``pyarrow.ipc.open_file(pyarrow.memory_map(path))`` without
+    deserializing, the stream format suits pipes and sockets.
+
+    :param mapper: the mapper to export
+    :param sink: file name or writable file-like object
+    :param chunk_size: count of rows in a record batch, by default the
+        chunk size of the node
+    :param stream: if True - use the IPC stream format instead of the file
+    :rtype int: count of written rows
+    """
+    pa = _import_pyarrow()
+    schema = arrow_schema(mapper)
+    new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+    rows = 0
+    with new_writer(sink, schema) as writer:
+        for start, stop in _chunks(mapper, chunk_size):
+            writer.write_batch(
+                _record_batch(pa, mapper, mapper._read_rows(start, stop))
+            )
+            rows += stop - start
+    return rows
@@ -0,0 +1,272 @@
+"""Streaming hash join of Table mappers into a target Table.
+
+The build side is held in memory sorted by the key, which serves as a
+compact hash: every chunk of the other (probe) side is matched against it
+with vectorized binary searches. If the build side does not fit into the
+memory limit, both sides are split into partitions by a hash of the key
+in a scratch HDF5 file and the partitions are joined pairwise.
+
+Rows of the target are filled by field names: fields listed in *columns*
+come from the right side, the others from the left side. Rows of a left
+join without a match have zeros (empty strings) in the right side fields.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import typing as ty
+
+from numpy.lib import recfunctions
+import numpy as np
+import tables as tb
+
+from pytables_mapping import consts
+from pytables_mapping.mapping import Table
+
+
+__all__ = [
+    'join',
+]
+
+
+HOWS = ('inner', 'left')
+
+# FNV-1a parameters of the partition hash
+FNV_OFFSET = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+
+
+class _BuildSide:
+    """Rows of the build side sorted by the key."""
+
+    def __init__(self,
+                 rows: np.ndarray,
+                 key: str,
+                 key_dtype: np.dtype) -> None:
+        keys = rows[key].astype(key_dtype)
+        order = np.argsort(keys, kind='stable')
+        self.rows = rows[order]
+        self.keys = keys[order]
+
+    def match(self,
+              keys: np.ndarray,
+              keep_unmatched: bool
+              ) -> ty.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return probe indices, build indices and mask of matched pairs.
+
+        :param keys: keys of probe rows
+        :param keep_unmatched: if True - probe rows without a match are
+            paired with the build row 0 and marked as unmatched
+        """
+        keys = keys.astype(self.keys.dtype)
+        low = np.searchsorted(self.keys, keys, side='left')
+        counts = np.searchsorted(self.keys, keys, side='right') - low
+        pairs = np.maximum(counts, 1) if keep_unmatched else counts
+        probe = np.repeat(np.arange(len(keys)), pairs)
+        offsets = np.arange(len(probe)) - np.repeat(np.cumsum(pairs) - pairs,
+                                                    pairs)
+        matched = np.repeat(counts > 0, pairs)
+        build = np.where(matched, np.repeat(low, pairs) + offsets, 0)
+        return probe, build, matched
+
+
+def _chunks(mapper: Table,
+            fields: ty.List[str],
+            chunk_size: int) -> ty.Iterator[np.ndarray]:
+    nrows = mapper.nrows
+    for start in range(0, nrows, chunk_size):
+        rows = mapper._read_rows(start, min(start + chunk_size, nrows))
+        yield recfunctions.repack_fields(rows[fields])
+
+
+def _partitions(keys: np.ndarray, count: int) -> np.ndarray:
+    """Return partition numbers of keys by FNV-1a hash of their bytes."""
+    hashes = np.full(len(keys), FNV_OFFSET, dtype=np.uint64)
+    data = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), -1)
+    with np.errstate(over='ignore'):
+        for column in data.T:
+            hashes ^= column
+            hashes *= FNV_PRIME
+    return (hashes % np.uint64(count)).astype(np.int64)
+
+
+class _Join:
+    """State of a join of two tables into the target."""
+
+    def __init__(self,
+                 left: Table,
+                 right: Table,
+                 target: Table,
+                 on: ty.Union[str, ty.Tuple[str, str]],
+                 how: str,
+                 columns: ty.Optional[ty.Sequence[str]]) -> None:
+        if how not in HOWS:
+            raise ValueError(f'Unknown join type {how!r}')
+        self.left_on, self.right_on = (on, on) if isinstance(on, str) else on
+        self.how = how
+        self.target = target
+        if not target.exists:
+            target.create()
+        right_names = right.dtype.names or ()
+        self.columns = list(
+            [name for name in right_names if name != self.right_on]
+            if columns is None else columns
+        )
+        target_names = target.dtype.names or ()
+        left_fields = [name for name in target_names
+                       if name not in self.columns]
+        unknown = set(left_fields) - set(left.dtype.names or ())
+        unknown |= set(self.columns) - set(right_names)
+        if unknown:
+            raise ValueError(f'Fields {sorted(unknown)} of the target are '
+                             f'missing in the joined tables')
+        self.left_fields = list(dict.fromkeys(left_fields + [self.left_on]))
+        right_fields = [name for name in self.columns
+                        if name in target_names]
+        self.right_fields = list(dict.fromkeys([*right_fields,
+                                                self.right_on]))
+
+        # the right side is built for left joins to emit unmatched rows
+        self.build_left = how == 'inner' and left.nrows < right.nrows
+        self.key_dtype = np.result_type(left.dtype[self.left_on],
+                                        right.dtype[self.right_on])
+        self.rows = 0
+
+    @property
+    def build_key(self) -> str:
+        """Return the key column of the build side."""
+        return self.left_on if self.build_left else self.right_on
+
+    @property
+    def probe_key(self) -> str:
+        """Return the key column of the streamed side."""
+        return self.right_on if self.build_left else self.left_on
+
+    def join(self, build: _BuildSide, probe: np.ndarray) -> None:
+        """Match a chunk of probe rows and append joined rows."""
+        probe_index, build_index, matched = build.match(
+            probe[self.probe_key], keep_unmatched=self.how == 'left'
+        )
+        if not len(probe_index):
+            return
+        probe_rows = probe[probe_index]
+        build_rows = build.rows[build_index] if len(build.rows) else \
+            np.zeros(len(probe_index), dtype=build.rows.dtype)
+        if self.build_left:
+            left_rows, right_rows = build_rows, probe_rows
+        else:
+            left_rows, right_rows = probe_rows, build_rows
+
+        joined = np.zeros(len(probe_index), dtype=self.target.dtype)
+        for name in joined.dtype.names:
+            if name in self.columns:
+                joined[name] = np.where(matched, right_rows[name],
+                                        joined[name])
+            else:
+                joined[name] = left_rows[name]
+        self.target._append_rows(joined, flush=False)
+        self.rows += len(joined)
+
+
+def join(left: Table,
+         right: Table,
+         target: Table,
+         on: ty.Union[str, ty.Tuple[str, str]],
+         how: str = 'inner',
+         columns: ty.Optional[ty.Sequence[str]] = None,
+         chunk_size: int = consts.DEFAULT_BULK_CHUNK_ROWS,
+         memory_limit: int = consts.DEFAULT_JOIN_MEMORY_LIMIT,
+         scratch_dir: ty.Optional[str] = None) -> int:
+    """Join rows of two tables on a key and append them to the target.
+
+    The smaller table of an inner join (the right table of a left join) is
+    the build side, the other one is streamed chunk by chunk. Joined rows
+    are appended in batches without flushing, the target is flushed once
+    at the end. The write-ahead journal of the store is bypassed.
+
+    Rows are appended in order of the streamed side unless partitions are
+    spilled to the scratch file, then partition by partition.
+
+    :param left: the left table
+    :param right: the right table
+    :param target: the table joined rows are appended to
+    :param on: name of the key column in both tables or a pair of names
+        of the left and the right key columns
+    :param how: 'inner' or 'left'
+    :param columns: fields of the target taken from the right table, by
+        default all right columns except the key
+    :param chunk_size: count of rows of the streamed side read at once
+    :param memory_limit: maximal size of the in-memory build side in bytes
+    :param scratch_dir: directory of the scratch file of partitions, the
+        system temporary directory by default
+    :return: count of appended rows
+    :rtype int:
+    """
+    state = _Join(left, right, target, on, how, columns)
+    if state.build_left:
+        build_mapper, build_fields = left, state.left_fields
+        probe_mapper, probe_fields = right, state.right_fields
+    else:
+        build_mapper, build_fields = right, state.right_fields
+        probe_mapper, probe_fields = left, state.left_fields
+
+    build_dtype = recfunctions.repack_fields(
+        np.empty(0, dtype=build_mapper.dtype)[build_fields]
+    ).dtype
+    build_size = build_mapper.nrows * build_dtype.itemsize
+    if build_size <= memory_limit:
+        build = _BuildSide(
+            np.concatenate([
+                np.empty(0, dtype=build_dtype),
+                *_chunks(build_mapper, build_fields, chunk_size)
+            ]),
+            state.build_key, state.key_dtype
+        )
+        for probe in _chunks(probe_mapper, probe_fields, chunk_size):
+            state.join(build, probe)
+    else:
+        count = 2 * -(-build_size // memory_limit)
+        with tempfile.TemporaryDirectory(dir=scratch_dir) as directory:
+            path = os.path.join(directory, 'partitions.h5')
+            with tb.open_file(path, mode='w') as scratch:
+                builds = _spill(scratch, 'build', build_mapper, build_fields,
+                                state.build_key, state.key_dtype, count,
+                                chunk_size)
+                probes = _spill(scratch, 'probe', probe_mapper, probe_fields,
+                                state.probe_key, state.key_dtype, count,
+                                chunk_size)
+                for build_node, probe_node in zip(builds, probes):
+                    build = _BuildSide(build_node.read(), state.build_key,
+                                       state.key_dtype)
+                    for start in range(0, probe_node.nrows, chunk_size):
+                        state.join(build, probe_node.read(start,
+                                                          start + chunk_size))
+
+    node = target.node
+    assert node is not None
+    node.flush()
+    return state.rows
+
+
+def _spill(scratch: tb.File,
+           name: str,
+           mapper: Table,
+           fields: ty.List[str],
+           key: str,
+           key_dtype: np.dtype,
+           count: int,
+           chunk_size: int) -> ty.List[tb.Table]:
+    """Split rows of the table into partitions in the scratch file."""
+    dtype = recfunctions.repack_fields(
+        np.empty(0, dtype=mapper.dtype)[fields]
+    ).dtype
+    nodes = [
+        scratch.create_table('/', f'{name}_{number}', description=dtype,
+                             filters=consts.DEFAULT_DATA_FILTER)
+        for number in range(count)
+    ]
+    for rows in _chunks(mapper, fields, chunk_size):
+        partitions = _partitions(rows[key].astype(key_dtype), count)
+        for number in np.unique(partitions):
+            nodes[number].append(rows[partitions == number])
+    return nodes
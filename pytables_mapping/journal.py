@@ -0,0 +1,268 @@
+"""Append-only write-ahead journal for appended data of the HDF5 store.
+
+Appended batches are written to a sequential binary log file next to the
+h5-file and are applied to the HDF5 nodes in large batched commits, so a
+crash in the middle of an append can not corrupt the h5-file itself.
+
+The log file layout is a header followed by records::
+
+    header: MAGIC, generation (uint64)
+    record: key length, payload length, crc32 (uint32 each), key, payload
+
+The key is the full node path of the mapper, the payload is the appended
+sequence serialized in the numpy ``.npy`` format. A torn record at the end
+of the log (e.g. after a crash) fails the crc check and is ignored.
+
+Records of a generation are applied in order and the count of applied
+records is kept in the h5-file, so if applying fails in the middle, the
+next commit or replay continues from the first record not applied. A
+journal that fails to replay is moved aside to ``<journal>.rejected``
+with a warning and the store is opened with an empty journal.
+"""
+from __future__ import annotations
+
+import io
+import os
+import struct
+import typing as ty
+import warnings
+import zlib
+
+from pytables_mapping import consts
+from pytables_mapping.lazy import LazyModule
+from pytables_mapping.mapping import BaseStoredObjectMapper
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+    import tables as tb
+else:
+    np = LazyModule('numpy')
+    tb = LazyModule('tables')
+
+
+__all__ = [
+    'Journal',
+]
+
+
+MAGIC = b'PTMJ'
+HEADER = struct.Struct('<4sQ')
+RECORD = struct.Struct('<III')
+
+# the root attribute with the last generation applied to the h5-file
+COMMITTED_GENERATION_ATTR = 'JOURNAL_GENERATION'
+# the root attribute with the count of applied records of the next generation
+APPLIED_RECORDS_ATTR = 'JOURNAL_APPLIED_RECORDS'
+
+
+# a mapper and its appended sequence, None for records of unknown nodes
+Record = ty.Tuple[ty.Optional[BaseStoredObjectMapper], 'np.ndarray']
+
+
+class Journal:
+    """Write-ahead journal bound to an opened PyTables file."""
+
+    def __init__(self,
+                 filename: str,
+                 hdf_store: 'tb.file.File',
+                 commit_size: int = consts.DEFAULT_JOURNAL_COMMIT_SIZE,
+                 fsync: bool = False,
+                 truncate: bool = False) -> None:
+        """Open (or create) the journal file.
+
+        :param filename: the name of the journal file
+        :param hdf_store: PyTables file object the journal is applied to
+        :param commit_size: size of pending data in bytes that triggers
+            a commit into the h5-file
+        :param fsync: if True - every written record is synced to disk
+        :param truncate: if True - discard any records of the existing file
+        """
+        self._filename = filename
+        self._hdf_store = hdf_store
+        self._commit_size = commit_size
+        self._fsync = fsync
+        self._pending: ty.List[Record] = []
+        self._pending_size = 0
+
+        exists = os.path.isfile(filename) and not truncate
+        self._file = open(filename, 'r+b' if exists else 'w+b')
+        generation = self._read_generation()
+        if generation is None:
+            self._generation = self.committed_generation + 1
+            self._truncate()
+        else:
+            self._generation = generation
+
+    @property
+    def filename(self) -> str:
+        """Return the name of the journal file."""
+        return self._filename
+
+    @property
+    def committed_generation(self) -> int:
+        """Return the last journal generation applied to the h5-file."""
+        return int(getattr(self._hdf_store.root._v_attrs,
+                           COMMITTED_GENERATION_ATTR, 0))
+
+    @property
+    def pending_size(self) -> int:
+        """Return size in bytes of the data not committed yet."""
+        return self._pending_size
+
+    def pending(self, mapper: BaseStoredObjectMapper) -> ty.List[np.ndarray]:
+        """Return sequences of the mapper written and not committed yet."""
+        return [sequence for pending_mapper, sequence in self._pending
+                if pending_mapper is mapper]
+
+    def write(self,
+              mapper: BaseStoredObjectMapper,
+              sequence: np.ndarray) -> None:
+        """Write appended sequence of the mapper to the journal.
+
+        :param mapper: the mapper the sequence is appended to
+        :param sequence: a sequence of data to append
+        """
+        # a copy, the caller may reuse the buffer before the commit
+        sequence = np.array(sequence, copy=True, subok=True)
+        if sequence.dtype.hasobject:
+            raise ValueError(f'Objects appended to {mapper.node_path} can '
+                             f'not be written to the journal')
+        self._write_record(mapper.node_path, sequence)
+        self._pending.append((mapper, sequence))
+        self._pending_size += sequence.nbytes
+        if self._pending_size >= self._commit_size:
+            self.commit()
+
+    def commit(self) -> None:
+        """Apply pending data to the h5-file and reset the journal."""
+        if not self._pending:
+            return
+        self._apply(self._pending)
+
+    def replay(self, mappers: ty.Iterable[BaseStoredObjectMapper]) -> int:
+        """Apply records of the journal not committed before.
+
+        :param mappers: all mappers of the store
+        :return: count of replayed records
+        """
+        if self._generation <= self.committed_generation:
+            self._truncate()
+            return 0
+
+        by_path = {mapper.node_path: mapper for mapper in mappers}
+        records: ty.List[Record] = []
+        try:
+            for key, sequence in self._read_records():
+                if key not in by_path:
+                    warnings.warn(
+                        f'Skip journal record for unknown node {key}'
+                    )
+                records.append((by_path.get(key), sequence))
+            return self._apply(records)
+        except Exception as error:
+            rejected = self._reject()
+            warnings.warn(f'Journal {self._filename} can not be replayed '
+                          f'({error!r}), it is moved to {rejected}')
+            return 0
+
+    def close(self, commit: bool = True) -> None:
+        """Commit pending data and close the journal file.
+
+        :param commit: if False - pending data is left in the journal file
+            to be replayed on the next open
+        """
+        if self._file.closed:
+            return
+        try:
+            if commit:
+                self.commit()
+        finally:
+            self._file.close()
+        if os.path.getsize(self._filename) <= HEADER.size:
+            os.remove(self._filename)
+
+    def _apply(self, records: ty.List[Record]) -> int:
+        """Apply records not applied yet and return their count."""
+        attrs = self._hdf_store.root._v_attrs
+        applied = int(getattr(attrs, APPLIED_RECORDS_ATTR, 0))
+        count = 0
+        for number, (mapper, sequence) in enumerate(records):
+            if number < applied or mapper is None:
+                continue
+            mapper._append_rows(sequence, flush=False)
+            attrs[APPLIED_RECORDS_ATTR] = number + 1
+            count += 1
+        attrs[COMMITTED_GENERATION_ATTR] = self._generation
+        attrs[APPLIED_RECORDS_ATTR] = 0
+        self._hdf_store.flush()
+        self._generation += 1
+        self._truncate()
+        return count
+
+    def _reject(self) -> str:
+        """Move the journal file aside and start a new empty generation."""
+        rejected = self._filename + consts.REJECTED_JOURNAL_SUFFIX
+        self._file.close()
+        os.replace(self._filename, rejected)
+        self._file = open(self._filename, 'w+b')
+        self._generation = self.committed_generation + 1
+        self._truncate()
+        return rejected
+
+    def _truncate(self) -> None:
+        # progress of a lost or stale generation does not apply to the new one
+        attrs = self._hdf_store.root._v_attrs
+        if getattr(attrs, APPLIED_RECORDS_ATTR, 0):
+            attrs[APPLIED_RECORDS_ATTR] = 0
+        self._pending = []
+        self._pending_size = 0
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(HEADER.pack(MAGIC, self._generation))
+        self._sync()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+
+    def _read_generation(self) -> ty.Optional[int]:
+        self._file.seek(0)
+        header = self._file.read(HEADER.size)
+        self._file.seek(0, io.SEEK_END)
+        if len(header) < HEADER.size:
+            return None
+        magic, generation = HEADER.unpack(header)
+        if magic != MAGIC:
+            return None
+        return generation
+
+    def _write_record(self, key: str, sequence: np.ndarray) -> None:
+        buffer = io.BytesIO()
+        np.save(buffer, sequence, allow_pickle=False)
+        encoded_key = key.encode()
+        payload = buffer.getvalue()
+        checksum = zlib.crc32(payload, zlib.crc32(encoded_key))
+        self._file.write(
+            RECORD.pack(len(encoded_key), len(payload), checksum)
+        )
+        self._file.write(encoded_key)
+        self._file.write(payload)
+        self._sync()
+
+    def _read_records(self) -> ty.Iterator[ty.Tuple[str, np.ndarray]]:
+        self._file.seek(HEADER.size)
+        while True:
+            header = self._file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            key_length, payload_length, checksum = RECORD.unpack(header)
+            encoded_key = self._file.read(key_length)
+            payload = self._file.read(payload_length)
+            if len(payload) < payload_length or checksum != zlib.crc32(
+                    payload, zlib.crc32(encoded_key)):
+                break
+            yield (encoded_key.decode(),
+                   np.load(io.BytesIO(payload), allow_pickle=False))
+        self._file.seek(0, io.SEEK_END)
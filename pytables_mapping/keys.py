@@ -0,0 +1,194 @@
+"""Persistent primary key index of Table mappers.
+
+The index is a sibling Table named ``<object name>_pk`` under the same
+FULL_NODE_PATH with ('key', 'row') rows. The rows form runs sorted by key,
+first rows of the runs are kept in an attribute of the index node.
+
+Appended keys are sorted and appended to the index as a new run. The last
+two runs are merged in place while the previous run is not larger than
+twice the last one, so run sizes decrease geometrically: there are at most
+log2(n) runs and every key is rewritten at most log2(n) times. Runs that
+follow each other in key order are joined without rewriting, so appending
+increasing keys only appends to the index.
+
+Lookups of a batch of keys run a vectorized binary search in every run
+reading only the probed index rows, large batches read key columns of runs
+once instead.
+"""
+from __future__ import annotations
+
+import typing as ty
+
+from pytables_mapping import consts
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+    import tables as tb
+else:
+    np = LazyModule('numpy')
+
+
+__all__ = [
+    'PrimaryKeyIndex',
+]
+
+
+class PrimaryKeyIndex:
+    """Sorted key to row index of a table column with unique values."""
+
+    def __init__(self, column: str) -> None:
+        """Initialize the index.
+
+        :param column: name of the key column
+        """
+        self.column = column
+
+    def node_name(self, mapper: ty.Any) -> str:
+        """Return name of the index node."""
+        return f'{mapper.name}_pk'
+
+    def index(self, mapper: ty.Any) -> 'tb.Table':
+        """Return the index node."""
+        return mapper._store.get_node(mapper.node._v_parent,
+                                      self.node_name(mapper))
+
+    def create(self, mapper: ty.Any) -> None:
+        """Create the index node next to the table node."""
+        dtype = mapper.dtype
+        if self.column not in (dtype.names or ()) or dtype[self.column].shape:
+            raise ValueError(f'Primary key {self.column!r} is not a scalar '
+                             f'column of {mapper.node_path}')
+        mapper._store.create_table(
+            mapper.node._v_parent, self.node_name(mapper),
+            description=np.dtype([('key', dtype[self.column]),
+                                  ('row', np.int64)]),
+            filters=consts.DEFAULT_INDEX_FILTER
+        )
+
+    def remove(self, mapper: ty.Any) -> None:
+        """Remove the index node."""
+        mapper._store.remove_node(mapper.node._v_parent,
+                                  self.node_name(mapper))
+
+    def lookup(self, mapper: ty.Any, keys: np.ndarray) -> np.ndarray:
+        """Return rows of the keys in the table, -1 for missing keys.
+
+        :param mapper: the table mapper
+        :param keys: array of keys
+        """
+        index = self.index(mapper)
+        rows = np.full(len(keys), -1, dtype=np.int64)
+        for start, stop in self._runs(index):
+            missing = np.flatnonzero(rows < 0)
+            if not missing.size:
+                break
+            positions = self._search(index, keys[missing], start, stop)
+            inside = positions < stop
+            if inside.any():
+                found = index.read_coordinates(positions[inside])
+                matched = found['key'] == keys[missing[inside]]
+                rows[missing[inside][matched]] = found['row'][matched]
+        return rows
+
+    def insert(self, mapper: ty.Any, keys: np.ndarray, start: int) -> None:
+        """Add keys of rows appended at *start* row to the index.
+
+        :param mapper: the table mapper
+        :param keys: keys of appended rows, unique and missing in the index
+        :param start: the first row of appended rows
+        """
+        if not len(keys):
+            return
+        index = self.index(mapper)
+        order = np.argsort(keys, kind='stable')
+        new = np.empty(len(keys), dtype=index.dtype)
+        new['key'] = keys[order]
+        new['row'] = start + order
+
+        starts = [start for start, _ in self._runs(index)]
+        starts.append(int(index.nrows))
+        index.append(new)
+        nrows = int(index.nrows)
+        while len(starts) > 1:
+            first, last = starts[-2], starts[-1]
+            boundary = index.read_coordinates([last - 1, last], field='key')
+            if boundary[0] >= boundary[1]:
+                if last - first > 2 * (nrows - last):
+                    break
+                runs = index.read(first)
+                index.modify_rows(
+                    first, nrows,
+                    rows=runs[np.argsort(runs['key'], kind='stable')]
+                )
+            starts.pop()
+        index._v_attrs[consts.PRIMARY_KEY_RUNS_ATTR] = np.array(
+            starts, dtype=np.int64
+        )
+        index.flush()
+
+    def check_new(self,
+                  mapper: ty.Any,
+                  keys: np.ndarray,
+                  pending: ty.Sequence[np.ndarray] = ()) -> None:
+        """Raise ValueError if keys are repeated or present in the index.
+
+        :param mapper: the table mapper
+        :param keys: keys of rows to append
+        :param pending: keys of rows appended before and not indexed yet
+        """
+        self.check_unique(keys)
+        if len(pending):
+            queued = np.isin(keys, np.concatenate(pending))
+            if queued.any():
+                raise ValueError(f'Primary keys are pending in the journal '
+                                 f'of {mapper.node_path}: {keys[queued]}')
+        present = self.lookup(mapper, keys) >= 0
+        if present.any():
+            raise ValueError(f'Primary keys exist in {mapper.node_path}: '
+                             f'{keys[present]}')
+
+    def check_unique(self, keys: np.ndarray) -> None:
+        """Raise ValueError if keys are repeated.
+
+        :param keys: keys of written rows
+        """
+        unique, counts = np.unique(keys, return_counts=True)
+        if (counts > 1).any():
+            raise ValueError(f'Repeated primary keys: {unique[counts > 1]}')
+
+    def _runs(self, index: 'tb.Table') -> ty.List[ty.Tuple[int, int]]:
+        """Return (start, stop) rows of sorted runs of the index."""
+        nrows = int(index.nrows)
+        if not nrows:
+            return []
+        attrs = index._v_attrs
+        starts = [int(start) for start in
+                  getattr(attrs, consts.PRIMARY_KEY_RUNS_ATTR, [0])]
+        return list(zip(starts, [*starts[1:], nrows]))
+
+    def _search(self,
+                index: 'tb.Table',
+                keys: np.ndarray,
+                start: int,
+                stop: int) -> np.ndarray:
+        """Return positions of the keys in a sorted run (left side)."""
+        size = stop - start
+        if len(keys) * max(size.bit_length(), 1) >= size:
+            return start + np.searchsorted(
+                index.read(start, stop, field='key'), keys
+            )
+
+        low = np.full(len(keys), start, dtype=np.int64)
+        high = np.full(len(keys), stop, dtype=np.int64)
+        active = np.flatnonzero(low < high)
+        while active.size:
+            middle = (low[active] + high[active]) // 2
+            probed, inverse = np.unique(middle, return_inverse=True)
+            values = index.read_coordinates(probed, field='key')[inverse]
+            less = values < keys[active]
+            low[active] = np.where(less, middle + 1, low[active])
+            high[active] = np.where(less, high[active], middle)
+            active = active[low[active] < high[active]]
+        return low
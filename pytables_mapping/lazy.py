@@ -0,0 +1,43 @@
+"""Lazy import of heavy modules (PyTables, NumPy).
+
+Importing ``tables`` loads the whole HDF5/blosc/numexpr stack, so the
+package modules use proxies that import the real module on the first
+attribute access, e.g. when the first store is opened.
+"""
+from __future__ import annotations
+
+import importlib
+import types
+import typing as ty
+
+
+__all__ = [
+    'LazyModule',
+]
+
+
+class LazyModule:
+    """Proxy of a module imported on the first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        """Initialize the proxy.
+
+        :param name: full name of the module, e.g. 'tables'
+        """
+        self._name = name
+        self._module: ty.Optional[types.ModuleType] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return True if the module has been imported by the proxy."""
+        return self._module is not None
+
+    def __getattr__(self, name: str) -> ty.Any:
+        """Import the module if needed and return its attribute."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, name)
+
+    def __repr__(self) -> str:
+        """Return representation of the proxy."""
+        return f'<lazy module {self._name!r}>'
@@ -0,0 +1,239 @@
+"""Bulk import of NumPy .npy/.npz, CSV and Parquet files into mappers.
+
+Source files are streamed in chunks, every chunk is converted to the dtype
+of the mapper node in a vectorized way (optionally in a pool of worker
+processes) and written with large appends followed by a single flush.
+Workers parse at most a few chunks ahead of the writer. Members of .npz
+archives are streamed from the zip file, except Fortran ordered or object
+arrays that are read whole. Parquet support requires the optional pyarrow
+package.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import multiprocessing
+import os
+import time
+import typing as ty
+import zipfile
+
+from numpy.lib import recfunctions
+import numpy as np
+
+from pytables_mapping import consts
+from pytables_mapping.mapping import BaseStoredObjectMapper
+from pytables_mapping.parallel import imap_bounded
+
+
+__all__ = [
+    'LoadStats',
+    'bulk_load',
+    'convert',
+]
+
+
+FORMATS = {
+    '.npy': 'npy',
+    '.npz': 'npz',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+
+class LoadStats(ty.NamedTuple):
+    """Progress of a bulk load."""
+
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        """Return average load rate."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def convert(data: ty.Any,
+            dtype: np.dtype,
+            row_shape: ty.Tuple[int, ...] = ()) -> np.ndarray:
+    """Convert a chunk of source data to the dtype of a mapper node.
+
+    :param data: a structured or a plain array, or a dict of columns
+    :param dtype: dtype of the node, structured for tables
+    :param row_shape: shape of a row of array nodes
+    :rtype numpy.ndarray:
+    """
+    if dtype.names is None:
+        return np.asarray(data, dtype=dtype).reshape((-1, ) + row_shape)
+
+    if isinstance(data, dict):
+        length = len(next(iter(data.values())))
+    elif getattr(getattr(data, 'dtype', None), 'names', None):
+        length = len(data)
+    else:
+        return recfunctions.unstructured_to_structured(
+            np.asarray(data), dtype=dtype, casting='unsafe'
+        )
+
+    result = np.empty(length, dtype=dtype)
+    for name in dtype.names:
+        result[name] = data[name]
+    return result
+
+
+def _read_npy(path: str,
+              chunk_size: int,
+              **options: ty.Any) -> ty.Iterator[ty.Any]:
+    data = np.load(path, mmap_mode='r')
+    for start in range(0, len(data), chunk_size):
+        yield np.asarray(data[start:start + chunk_size])
+
+
+def _read_npz_member(archive: zipfile.ZipFile,
+                     name: str,
+                     chunk_size: int) -> ty.Iterator[np.ndarray]:
+    # npz members can not be memory-mapped, rows are read from the zip
+    # stream right after the .npy header
+    with archive.open(name + '.npy') as member:
+        version = np.lib.format.read_magic(member)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(member)
+        elif version == (2, 0):
+            header = np.lib.format.read_array_header_2_0(member)
+        else:
+            header = None
+        if header is None or header[1] or header[2].hasobject:
+            member.seek(0)
+            data = np.load(member, allow_pickle=False)
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+            return
+
+        shape, _, dtype = header
+        row_shape = tuple(shape[1:])
+        row_size = dtype.itemsize * math.prod(row_shape)
+        for start in range(0, shape[0], chunk_size):
+            count = min(chunk_size, shape[0] - start)
+            yield np.frombuffer(member.read(count * row_size),
+                                dtype=dtype).reshape((count, ) + row_shape)
+
+
+def _read_npz(path: str,
+              chunk_size: int,
+              key: ty.Optional[str] = None,
+              **options: ty.Any) -> ty.Iterator[ty.Any]:
+    with zipfile.ZipFile(path) as archive:
+        names = [name[:-len('.npy')] for name in archive.namelist()
+                 if name.endswith('.npy')]
+        if key is not None or len(names) == 1:
+            yield from _read_npz_member(archive, key or names[0], chunk_size)
+            return
+        columns = [_read_npz_member(archive, name, chunk_size)
+                   for name in names]
+        for chunks in zip(*columns):
+            yield dict(zip(names, chunks))
+
+
+def _read_csv(path: str,
+              chunk_size: int,
+              skip_header: int = 1,
+              **options: ty.Any) -> ty.Iterator[ty.Any]:
+    with open(path, 'rb') as source:
+        lines = itertools.islice(source, skip_header, None)
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+
+def _read_parquet(path: str,
+                  chunk_size: int,
+                  **options: ty.Any) -> ty.Iterator[ty.Any]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError('Parquet import requires pyarrow package') from exc
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch
+
+
+READERS = {
+    'npy': _read_npy,
+    'npz': _read_npz,
+    'csv': _read_csv,
+    'parquet': _read_parquet,
+}
+
+
+def _parse(args: ty.Tuple[str, ty.Any, np.dtype, ty.Tuple[int, ...],
+                          ty.Dict[str, ty.Any]]) -> np.ndarray:
+    fmt, raw, dtype, row_shape, options = args
+    if fmt == 'csv':
+        delimiter = options.get('delimiter', ',')
+        if dtype.names is not None:
+            return np.loadtxt(raw, dtype=dtype, delimiter=delimiter,
+                              ndmin=1)
+        raw = np.loadtxt(raw, dtype=dtype, delimiter=delimiter, ndmin=1)
+    elif fmt == 'parquet':
+        raw = {name: column.to_numpy(zero_copy_only=False)
+               for name, column in zip(raw.schema.names, raw.columns)}
+        if dtype.names is None:
+            raw = next(iter(raw.values()))
+    return convert(raw, dtype, row_shape)
+
+
+def bulk_load(mapper: BaseStoredObjectMapper,
+              path: str,
+              fmt: ty.Optional[str] = None,
+              chunk_size: int = consts.DEFAULT_BULK_CHUNK_ROWS,
+              processes: int = 0,
+              progress: ty.Optional[ty.Callable[[LoadStats], None]] = None,
+              **options: ty.Any) -> LoadStats:
+    """Stream a source file into the mapper with large appends.
+
+    Chunks are appended without flushing, the node is flushed once at the
+    end. The write-ahead journal of the store is bypassed.
+
+    :param mapper: the mapper to load data into, e.g. Table or EArray
+    :param path: path to the source file
+    :param fmt: one of 'npy', 'npz', 'csv', 'parquet', by default it is
+        detected by the file extension
+    :param chunk_size: count of source rows parsed and appended at once
+    :param processes: count of worker processes parsing chunks while the
+        current process writes, 0 - parse in the current process
+    :param progress: callback called with LoadStats after every chunk
+    :param options: format options: 'key' of the npz member,
+        'delimiter' and 'skip_header' of csv files
+    :rtype LoadStats:
+    """
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in READERS:
+        raise ValueError(f'Unknown format of the source file {path}')
+
+    if not mapper.exists:
+        mapper.create()
+    node = mapper.node
+    assert node is not None
+    row_shape = tuple(node.shape[1:])
+    tasks = ((fmt, raw, mapper.dtype, row_shape, options)
+             for raw in READERS[fmt](path, chunk_size, **options))
+
+    pool = multiprocessing.Pool(processes) if processes else None
+    started = time.perf_counter()
+    stats = LoadStats(0, 0.0)
+    try:
+        chunks = imap_bounded(pool, _parse, tasks,
+                              processes * consts.BULK_CHUNKS_PER_PROCESS)
+        for chunk in chunks:
+            mapper._append_rows(chunk, flush=False)
+            stats = LoadStats(stats.rows + len(chunk),
+                              time.perf_counter() - started)
+            if progress is not None:
+                progress(stats)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    node.flush()
+    return LoadStats(stats.rows, time.perf_counter() - started)
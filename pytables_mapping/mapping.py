@@ -1,30 +1,65 @@
 """Base classes for mapping stored objects in HDF-tree."""
 from __future__ import annotations
 
+import itertools
+import posixpath
 import typing as ty
 
-import numpy as np
-import tables as tb
+from pytables_mapping import codecs as column_codecs
+from pytables_mapping import consts
+from pytables_mapping import sampling
+from pytables_mapping.keys import PrimaryKeyIndex
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    from numpy.lib import recfunctions
+    import numpy as np
+    import tables as tb
+
+    from pytables_mapping.cache import ResultCache
+    from pytables_mapping.journal import Journal
+    from pytables_mapping.rollups import Rollups
+
+    NumPyKey = ty.Union[
+        int, slice,
+        ty.Tuple[ty.Union[int, slice], ...],
+        np.ndarray
+    ]
+
+    NumPyValue = ty.Union[int, float, bool, np.ndarray,
+                          ty.Tuple[ty.Union[int, float, bool], ...]]
+else:
+    np = LazyModule('numpy')
+    recfunctions = LazyModule('numpy.lib.recfunctions')
+    tb = LazyModule('tables')
 
 
 __all__ = [
     'BaseStoredObjectMapper',
     'Table',
     'Array',
+    'ChunkedArray',
     'CArray',
     'EArray',
     'VLArray'
 ]
 
 
-NumPyKey = ty.Union[
-    int, slice,
-    ty.Tuple[ty.Union[int, slice], ...],
-    np.ndarray
-]
-
-NumPyValue = ty.Union[int, float, bool, np.ndarray,
-                      ty.Tuple[ty.Union[int, float, bool], ...]]
+def _where_args(condition: str,
+                condvars: ty.Optional[ty.Dict],
+                *args: ty.Any) -> ty.Optional[ty.Tuple[ty.Any, ...]]:
+    """Return hashable arguments of read_where or None if there are not."""
+    variables = []
+    for name, value in sorted((condvars or {}).items()):
+        if isinstance(value, np.ndarray):
+            value = (value.dtype.str, value.shape, value.tobytes())
+        try:
+            hash(value)
+        except TypeError:
+            return None
+        variables.append((name, value))
+    return (condition.strip(), tuple(variables)) + args
 
 
 class BaseStoredObjectMapper:
@@ -37,6 +72,8 @@ class BaseStoredObjectMapper:
     OBJECT_NAME: ty.Optional[str] = None
     TITLE: str = ''
     TRACK_TIMES: bool = True
+    # rollup levels updated on writes, see pytables_mapping.rollups
+    ROLLUPS: ty.Optional['Rollups'] = None
 
     def __init__(self,
                  object_name: ty.Optional[str] = None,
@@ -62,30 +99,42 @@ class BaseStoredObjectMapper:
         self._title = create_params.get('title', self.TITLE)
         self._byteorder = create_params.get('byteorder', self.BYTEORDER)
         self._track_times = create_params.get('track_times', self.TRACK_TIMES)
-        (self._parent_node_path, self._node_name) = tb.path.split_path(
-            self._full_node_path
+        (self._parent_node_path, self._node_name) = posixpath.split(
+            ty.cast(str, self._full_node_path)
         )
         self._node = None
         self._store = None
+        self._journal: ty.Optional['Journal'] = None
+        self._cache: ty.Optional['ResultCache'] = None
+        self._version = 0
         self._create_params = create_params
 
-    def reset_store(self, new_store: 'tb.file.File') -> None:
+    def reset_store(self,
+                    new_store: 'tb.file.File',
+                    journal: ty.Optional['Journal'] = None,
+                    cache: ty.Optional['ResultCache'] = None) -> None:
         """Reassign store of main mapper instance.
 
         :param new_store: PyTables file object
+        :param journal: write-ahead journal for appended data, if enabled
+        :param cache: cache of read results, if enabled
         """
         self._store = new_store
+        self._journal = journal
+        self._cache = cache
         self._node = None
+        self._bump_version()
 
     def __setitem__(self, key: NumPyKey, value: NumPyValue) -> None:
         """Set a row, a range of rows or a slice in the array."""
-        if self._node is None:
+        if not self.exists:
             self.create()
-        self._node.__setitem__(key, value)
+        self.node.__setitem__(key, value)
+        self._commit_updated(key)
 
     def __getitem__(self, key: NumPyKey) -> ty.Iterable[ty.Any]:
         """Get a row, a range of rows or a slice from the array."""
-        return self._node.__getitem__(key)
+        return self.node.__getitem__(key)
 
     @property
     def create_params(self) -> ty.Dict[str, ty.Any]:
@@ -97,18 +146,48 @@ class BaseStoredObjectMapper:
         """Return stored object name."""
         return self._object_name
 
+    @property
+    def rollups(self) -> ty.Optional['Rollups']:
+        """Return declaration of rollup levels of the node, if any."""
+        return self.create_params.get('rollups', self.ROLLUPS)
+
+    @property
+    def node_path(self) -> str:
+        """Return full path of the stored node, e.g. '/folder/my_table'."""
+        return tb.path.join_path(self._full_node_path, self._object_name)
+
+    @property
+    def exists(self) -> bool:
+        """Return True if the stored node exists in the store."""
+        return self._store is not None and self.node_path in self._store
+
     @property
     def node(self) -> ty.Optional[ty.Type['tb.Array']]:
         """Return table node object of current representation."""
         if self._store is None:
             return None
         if self._node is None:
-            self._node = self._store.get_node(
-                tb.path.join_path(self._full_node_path, self._object_name)
-            )
+            self._node = self._store.get_node(self.node_path)
 
         return self._node
 
+    @property
+    def version(self) -> int:
+        """Return write version of the node bumped by every write."""
+        return self._version
+
+    @property
+    def _existing_node(self) -> ty.Optional[ty.Type['tb.Array']]:
+        """Return the node if it exists in the store, None otherwise."""
+        return self.node if self.exists else None
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Return dtype of rows as they are read from the node."""
+        node = self.node
+        assert node is not None
+        return node.dtype
+
     @property
     def parent_node(self) -> 'tb.group.RootGroup':
         """Return parent node object."""
@@ -118,6 +197,7 @@ class BaseStoredObjectMapper:
         """Set up mapping variables here with self.create_params."""
         assert self._store
         self._node = None
+        self._bump_version()
 
         if self._overwrite and self._full_node_path in self._store:
             self._store.remove_node(
@@ -127,8 +207,132 @@ class BaseStoredObjectMapper:
     def remove(self) -> None:
         """Remove current node with the same object in store object."""
         assert self._store
+        if self.rollups is not None:
+            self.rollups.remove(self)
         self._node = None
         self._store.remove_node(self._full_node_path, self._object_name)
+        self._bump_version()
+
+    def _append(self, sequence: np.ndarray) -> None:
+        """Add a sequence to the journal if enabled or to the node itself."""
+        if self._journal is not None:
+            self._journal.write(self, sequence)
+        else:
+            self._append_rows(sequence)
+
+    def _append_rows(self, sequence: np.ndarray, flush: bool = True) -> None:
+        """Add a sequence of data directly to the end of the node."""
+        if not self.exists:
+            self.create()
+        start = self.nrows
+        self.node.append(self._encode_appended(sequence, start))
+        self._commit_appended(sequence, start)
+        if flush:
+            self.node.flush()
+        if self.rollups is not None:
+            self.rollups.update(self, np.asarray(sequence), start, flush)
+        self._bump_version()
+
+    def _encode_appended(self, sequence: ty.Any, start: int) -> ty.Any:
+        """Return appended rows as they are stored in the node."""
+        return sequence
+
+    def _commit_appended(self, sequence: ty.Any, start: int) -> None:
+        """Save auxiliary state of rows appended to the node, if any."""
+
+    def _commit_updated(self, key: NumPyKey) -> None:
+        """Recompute rollups of rows overwritten in place by the key."""
+        if self.rollups is not None:
+            self.rollups.refresh(self, self._updated_rows(key))
+        self._bump_version()
+
+    def _updated_rows(self, key: ty.Any) -> np.ndarray:
+        """Return rows along the first axis selected by the key."""
+        nrows = self.nrows
+        if isinstance(key, tuple):
+            key = key[0] if key else Ellipsis
+        if key is Ellipsis:
+            key = slice(None)
+        if isinstance(key, slice):
+            return np.arange(*key.indices(nrows), dtype=np.int64)
+        rows = np.atleast_1d(np.asarray(key))
+        if rows.dtype == np.bool_:
+            return np.flatnonzero(rows)
+        rows = rows.astype(np.int64)
+        return np.where(rows < 0, rows + nrows, rows)
+
+    def read_downsampled(self,
+                         start: ty.Optional[int] = None,
+                         stop: ty.Optional[int] = None,
+                         max_points: int = 1000) -> ty.Any:
+        """Read at most about *max_points* aggregated rows of the range.
+
+        The coarsest rollup level adequate for *max_points* is used, see
+        pytables_mapping.rollups.
+
+        :param start: start value of range
+        :type start: int or None
+        :param stop: stop value of range
+        :type stop: int or None
+        :param max_points: maximal count of returned rows
+        :type max_points: int
+        :rtype numpy.ndarray:
+        """
+        rollups = self.rollups
+        if rollups is None:
+            raise ValueError(f'There are no rollups of {self.node_path}')
+        start, stop, _ = slice(start, stop).indices(self.nrows)
+        return self._cached(
+            'read_downsampled', (start, stop, max_points),
+            lambda: rollups.read(self, start, max(start, stop), max_points)
+        )
+
+    def _bump_version(self) -> None:
+        """Increase write version and drop cached results of the node."""
+        self._version += 1
+        if self._cache is not None:
+            self._cache.invalidate(self.node_path)
+
+    def _cached(self,
+                method: str,
+                args: ty.Optional[ty.Tuple[ty.Any, ...]],
+                read: ty.Callable[[], ty.Any]) -> ty.Any:
+        """Return result of the read through the cache, if it is enabled.
+
+        :param method: name of the read method
+        :param args: normalized hashable arguments, None - not cacheable
+        :param read: function reading the result
+        """
+        if self._cache is None or args is None:
+            return read()
+        return self._cache.get((self.node_path, self._version, method, args),
+                               read)
+
+    def _cached_read(self,
+                     start: ty.Optional[int],
+                     stop: ty.Optional[int],
+                     step: ty.Optional[int],
+                     out: ty.Optional[np.ndarray]) -> ty.Any:
+        """Read a range of rows of the node through the cache."""
+        node = self.node
+        assert node is not None
+        if out is not None:
+            return node.read(start, stop, step, out)
+        return self._cached(
+            'read', slice(start, stop, step).indices(self.nrows),
+            lambda: node.read(start, stop, step)
+        )
+
+    def _read_rows(self,
+                   start: int,
+                   stop: int,
+                   out: ty.Optional[np.ndarray] = None) -> ty.Any:
+        """Read contiguous rows of the node, optionally into *out*."""
+        node = self.node
+        assert node is not None
+        if out is None:
+            return node.read(start, stop)
+        return node.read(start, stop, out=out)
 
     @property
     def nrows(self) -> int:
@@ -138,6 +342,102 @@ class BaseStoredObjectMapper:
         else:
             return 0
 
+    @property
+    def chunk_rows(self) -> int:
+        """Return count of rows in a chunk of the node along the first axis.
+
+        Not chunked nodes are treated as a single chunk.
+        """
+        chunkshape = getattr(self.node, 'chunkshape', None)
+        if chunkshape:
+            return chunkshape[0]
+        return max(self.nrows, 1)
+
+    def sample(self,
+               n: int,
+               seed: ty.Optional[int] = None,
+               strategy: str = 'exact',
+               stratify: ty.Optional[str] = None,
+               chunk_size: ty.Optional[int] = None) -> np.ndarray:
+        """Return a random sample of rows in storage order.
+
+        See pytables_mapping.sampling for the strategies.
+
+        :param n: count of sampled rows
+        :type n: int
+        :param seed: seed of the random generator
+        :type seed: int or None
+        :param strategy: 'exact' - a uniform sample reading only chunks
+            with sampled rows, 'chunks' - an approximate sample of whole
+            random chunks
+        :type strategy: str
+        :param stratify: table column to stratify the sample by
+        :type stratify: str or None
+        :param chunk_size: count of rows read at once, by default the chunk
+            size of the node
+        :type chunk_size: int or None
+        :rtype numpy.ndarray:
+        """
+        return sampling.sample(self, n, seed, strategy, stratify, chunk_size)
+
+    def get_tail_offset(self, consumer: str) -> int:
+        """Return the row the consumer stopped reading at, 0 by default.
+
+        :param consumer: name of the consumer
+        """
+        node = self._existing_node
+        if node is None:
+            return 0
+        return int(getattr(node._v_attrs,
+                           consts.TAIL_OFFSET_ATTR_PREFIX + consumer, 0))
+
+    def set_tail_offset(self, consumer: str, row: int) -> None:
+        """Save the row the consumer stopped reading at in the node attrs.
+
+        :param consumer: name of the consumer
+        :param row: the first row not read by the consumer yet
+        """
+        node = self._existing_node
+        if node is None:
+            raise ValueError(f'Node {self.node_path} does not exist')
+        node._v_attrs[consts.TAIL_OFFSET_ATTR_PREFIX + consumer] = row
+
+    def tail(self,
+             from_row: ty.Optional[int] = None,
+             consumer: ty.Optional[str] = None,
+             chunk_size: ty.Optional[int] = None
+             ) -> ty.Generator[ty.Any, None, None]:
+        """Iterate over rows appended since the given row in batches.
+
+        If *consumer* is given, reading starts at the offset saved for it
+        and the offset is moved past each batch once the next one is
+        requested, so a consumer that stops in the middle will get the
+        unprocessed batch again. The offset is saved only if the store is
+        writable.
+
+        :param from_row: the first row to read, overrides consumer offset
+        :type from_row: int or None
+        :param consumer: name of the consumer with a persistent offset
+        :type consumer: str or None
+        :param chunk_size: count of rows in a batch, by default the chunk
+            size of the node along the first axis
+        :type chunk_size: int or None
+        :rtype iterator of numpy.ndarray:
+        """
+        if from_row is None:
+            from_row = self.get_tail_offset(consumer) if consumer else 0
+        stop = self.nrows
+        chunk_size = chunk_size or self.chunk_rows
+        store = self._store
+        commit = consumer is not None and store is not None \
+            and store._iswritable()
+
+        for start in range(from_row, stop, chunk_size):
+            batch_stop = min(start + chunk_size, stop)
+            yield self._read_rows(start, batch_stop)
+            if commit:
+                self.set_tail_offset(ty.cast(str, consumer), batch_stop)
+
 
 class Table(BaseStoredObjectMapper):
     """Mapping class for a numpy tables container."""
@@ -146,24 +446,101 @@ class Table(BaseStoredObjectMapper):
     EXPECTEDROWS: ty.Optional[int] = 10000
     FILTERS: ty.Optional['tb.Filters'] = None
     DESCRIPTION: ty.Optional[np.dtype] = None
+    # storage codecs by column names, see pytables_mapping.codecs
+    COLUMN_CODECS: ty.Optional[ty.Dict[str, column_codecs.ColumnCodec]] = None
+    # column with unique values indexed for get_many and upsert
+    PRIMARY_KEY: ty.Optional[str] = None
+
+    def __setitem__(self, key: NumPyKey, value: NumPyValue) -> None:
+        """Set a row, a range of rows or a slice in the table."""
+        if self.primary_key is not None and self.exists:
+            stored = np.atleast_1d(np.asarray(self[key]))[self.primary_key]
+            updated = self._to_records(value)[self.primary_key]
+            if not np.array_equal(np.broadcast_to(updated, stored.shape),
+                                  stored):
+                raise ValueError(f'Primary key {self.primary_key!r} of '
+                                 f'{self.node_path} can not be changed')
+        if not self.column_codecs:
+            super().__setitem__(key, value)
+            return
+        if not self.exists:
+            self.create()
+        coords = self._coordinates(key)
+        records = self._to_records(value)
+        if len(records) != len(coords):
+            records = np.broadcast_to(records, coords.shape).copy()
+        rows = self._encode(records, coords=coords)
+        node = self.node
+        assert node is not None
+        node[key] = rows[0].item() if isinstance(key, (int, np.integer)) \
+            else rows
+        self._commit_encoded(records, None)
+        self._commit_updated(key)
+
+    def __getitem__(self, key: NumPyKey) -> ty.Iterable[ty.Any]:
+        """Get a row, a range of rows or a slice from the table."""
+        if not self.column_codecs:
+            return super().__getitem__(key)
+        if isinstance(key, slice):
+            return self.read(key.start, key.stop, key.step)
+        coords = self._coordinates(key)
+        if isinstance(key, (int, np.integer)):
+            return self._read_coordinates(coords)[0]
+        return self._read_coordinates(coords)
+
+    @property
+    def column_codecs(self) -> ty.Dict[str, column_codecs.ColumnCodec]:
+        """Return storage codecs by column names."""
+        return self.create_params.get('column_codecs',
+                                      self.COLUMN_CODECS) or {}
+
+    @property
+    def primary_key(self) -> ty.Optional[str]:
+        """Return name of the primary key column, if any."""
+        return self.create_params.get('primary_key', self.PRIMARY_KEY)
+
+    @property
+    def key_index(self) -> ty.Optional[PrimaryKeyIndex]:
+        """Return index of the primary key, if any."""
+        if self.primary_key is None:
+            return None
+        return PrimaryKeyIndex(self.primary_key)
+
+    @property
+    def description(self) -> ty.Any:
+        """Return description of the table rows."""
+        return self.create_params.get('description', self.DESCRIPTION)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Return dtype of rows as they are read from the table."""
+        if self.column_codecs:
+            return np.dtype(self.description)
+        return super().dtype
 
     def append(self, sequence: np.ndarray) -> None:
         """Add a sequence of data to the end of the dataset."""
-        if self._node is None:
-            self.create()
-        self._node.append(sequence)
-        self._node.flush()
+        self._append(sequence)
 
     def create(self) -> None:
         """Create the Table object in a store."""
         super().create()
         params = self.create_params
+        description = self.description
+        filters = params.get('filters', self.FILTERS)
+        codecs = self.column_codecs
+        if codecs:
+            description = column_codecs.storage_dtype(
+                np.dtype(description), codecs
+            )
+            filters = column_codecs.shuffled_filters(filters, codecs)
+
         self._node = self._store.create_table(
             self._full_node_path,
             self._object_name,
-            description=params.get('description', self.DESCRIPTION),
+            description=description,
             title=self._title,
-            filters=params.get('filters', self.FILTERS),
+            filters=filters,
             expectedrows=params.get('expectedrows', self.EXPECTEDROWS),
             chunkshape=params.get('chunkshape', self.CHUNKSHAPE),
             byteorder=self._byteorder,
@@ -171,6 +548,239 @@ class Table(BaseStoredObjectMapper):
             obj=self._obj,
             track_times=self._track_times
         )
+        for column, codec in codecs.items():
+            codec.create(self, column)
+        if self.rollups is not None:
+            self.rollups.create(self)
+        if self.key_index is not None:
+            self.key_index.create(self)
+
+    def remove(self) -> None:
+        """Remove the table with auxiliary nodes of codecs and the key."""
+        for column, codec in self.column_codecs.items():
+            codec.remove(self, column)
+        if self.key_index is not None:
+            self.key_index.remove(self)
+        super().remove()
+
+    def get_many(self,
+                 keys: ty.Any,
+                 skip_missing: bool = False) -> np.ndarray:
+        """Read rows with the given primary keys in order of the keys.
+
+        :param keys: sequence of primary keys
+        :param skip_missing: if True - missing keys are skipped, otherwise
+            KeyError is raised
+        :rtype numpy.ndarray:
+        """
+        rows = self.lookup(keys)
+        missing = rows < 0
+        if missing.any() and not skip_missing:
+            raise KeyError(f'Primary keys are missing in {self.node_path}: '
+                           f'{np.asarray(keys)[missing]}')
+        rows = rows[~missing]
+        order = np.argsort(rows, kind='stable')
+        records = np.empty(len(rows), dtype=self.dtype)
+        if len(rows):
+            records[order] = self[rows[order]]
+        return records
+
+    def lookup(self, keys: ty.Any) -> np.ndarray:
+        """Return rows of the given primary keys, -1 for missing keys.
+
+        :param keys: sequence of primary keys
+        :rtype numpy.ndarray:
+        """
+        key_index = self.key_index
+        if key_index is None:
+            raise ValueError(f'There is no primary key of {self.node_path}')
+        keys = np.atleast_1d(np.asarray(keys,
+                                        dtype=self.dtype[key_index.column]))
+        if not self.exists:
+            return np.full(len(keys), -1, dtype=np.int64)
+        return key_index.lookup(self, keys)
+
+    def upsert(self, sequence: ty.Any) -> None:
+        """Update rows with existing primary keys and append the others.
+
+        Existing rows are updated in place and new rows are appended in one
+        batch directly to the table, bypassing the journal. Pending data of
+        the journal is committed first, so its keys are looked up too.
+
+        :param sequence: rows with unique primary keys
+        """
+        key_index = self.key_index
+        if key_index is None:
+            raise ValueError(f'There is no primary key of {self.node_path}')
+        if not self.exists:
+            self.create()
+        if self._journal is not None:
+            self._journal.commit()
+        records = self._to_records(sequence)
+        keys = records[key_index.column]
+        # the whole batch is checked before any row is written
+        key_index.check_unique(keys)
+        rows = key_index.lookup(self, keys)
+        existing = rows >= 0
+        if existing.any():
+            self[rows[existing]] = records[existing]
+        if not existing.all():
+            self._append_rows(records[~existing])
+
+    def _append(self, sequence: np.ndarray) -> None:
+        """Check primary keys before the rows are added to the journal."""
+        key_index = self.key_index
+        if key_index is not None and self._journal is not None:
+            if not self.exists:
+                self.create()
+            sequence = self._to_records(sequence)
+            pending = [rows[key_index.column]
+                       for rows in self._journal.pending(self)]
+            key_index.check_new(self, sequence[key_index.column], pending)
+        super()._append(sequence)
+
+    def _append_rows(self, sequence: np.ndarray, flush: bool = True) -> None:
+        """Convert rows to records for codecs, rollups and the key."""
+        key_index = self.key_index
+        derived = self.rollups is not None or key_index is not None
+        if self.column_codecs or derived:
+            if not self.exists:
+                self.create()
+            sequence = self._to_records(sequence)
+        if key_index is None:
+            super()._append_rows(sequence, flush)
+            return
+        keys = sequence[key_index.column]
+        key_index.check_new(self, keys)
+        start = self.nrows
+        super()._append_rows(sequence, flush)
+        key_index.insert(self, keys, start)
+
+    def _encode_appended(self, sequence: ty.Any, start: int) -> ty.Any:
+        """Encode columns of appended rows with codecs."""
+        if self.column_codecs:
+            return self._encode(sequence, start)
+        return sequence
+
+    def _commit_appended(self, sequence: ty.Any, start: int) -> None:
+        """Save state of codecs of appended rows."""
+        self._commit_encoded(sequence, start)
+
+    def _read_rows(self,
+                   start: int,
+                   stop: int,
+                   out: ty.Optional[np.ndarray] = None) -> ty.Any:
+        """Read and decode contiguous rows bypassing the result cache."""
+        return self._read(start, stop, None, None, out)
+
+    def _updated_rows(self, key: ty.Any) -> np.ndarray:
+        """Return coordinates of rows selected by the key."""
+        return self._coordinates(key)
+
+    def _coordinates(self, key: ty.Any) -> np.ndarray:
+        """Return coordinates of rows selected by a key.
+
+        Negative indices are counted from the end, boolean masks select
+        rows where they are True.
+        """
+        nrows = self.nrows
+        if isinstance(key, slice):
+            return np.arange(*key.indices(nrows), dtype=np.int64)
+        coords = np.asarray(key)
+        if coords.ndim > 1:
+            raise IndexError(f'Only 1-dimensional indices of rows are '
+                             f'supported, got {coords.ndim} dimensions')
+        if coords.dtype == np.bool_:
+            if coords.shape != (nrows, ):
+                raise IndexError(f'Boolean index of {coords.size} rows does '
+                                 f'not match {nrows} rows')
+            return np.flatnonzero(coords)
+        if not coords.size:
+            return np.empty(0, dtype=np.int64)
+        if coords.dtype.kind not in 'iu':
+            raise IndexError(f'Rows can not be indexed by {coords.dtype}')
+        coords = np.atleast_1d(coords).astype(np.int64)
+        coords = np.where(coords < 0, coords + nrows, coords)
+        if coords.min() < 0 or coords.max() >= nrows:
+            raise IndexError(f'Index is out of range of {nrows} rows')
+        return coords
+
+    def _to_records(self, sequence: ty.Any) -> np.ndarray:
+        """Convert rows to a record array of the table description."""
+        dtype = self.dtype
+        if isinstance(sequence, np.ndarray) and sequence.dtype.names is None \
+                and sequence.ndim == 2:
+            return recfunctions.unstructured_to_structured(sequence,
+                                                           dtype=dtype)
+        return np.atleast_1d(np.asarray(sequence, dtype=dtype))
+
+    def _encode(self,
+                rows: np.ndarray,
+                start: int = 0,
+                coords: ty.Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode rows appended at *start* row or updated at *coords*."""
+        node = self.node
+        assert node is not None
+        stored = np.empty(len(rows), dtype=node.dtype)
+        codecs = self.column_codecs
+        for name in rows.dtype.names or ():
+            if name not in codecs:
+                stored[name] = rows[name]
+            elif coords is not None:
+                stored[name] = codecs[name].update(self, name, rows[name],
+                                                   coords)
+            else:
+                stored[name] = codecs[name].encode(self, name, rows[name],
+                                                   start)
+        return stored
+
+    def _commit_encoded(self,
+                        rows: np.ndarray,
+                        start: ty.Optional[int] = None) -> None:
+        """Save state of codecs once encoded rows are written."""
+        for name, codec in self.column_codecs.items():
+            codec.commit(self, name, rows[name], start)
+
+    def _decode(self,
+                stored: np.ndarray,
+                start: int,
+                field: ty.Optional[str] = None) -> np.ndarray:
+        """Decode contiguous stored rows (or a field) beginning at *start*."""
+        codecs = self.column_codecs
+        if field is not None:
+            if field not in codecs:
+                return stored
+            return codecs[field].decode(self, field, stored, start)
+
+        rows = np.empty(len(stored), dtype=self.dtype)
+        for name in rows.dtype.names:
+            rows[name] = self._decode(stored[name], start, name)
+        return rows
+
+    def _read_coordinates(self,
+                          coords: np.ndarray,
+                          field: ty.Optional[str] = None) -> np.ndarray:
+        """Read and decode rows (or a field) with the given coordinates."""
+        node = self.node
+        assert node is not None
+        stored = node.read_coordinates(coords, field=field)
+        if field is not None:
+            return self._decode_column(stored, field, coords)
+
+        rows = np.empty(len(stored), dtype=self.dtype)
+        for name in rows.dtype.names:
+            rows[name] = self._decode_column(stored[name], name, coords)
+        return rows
+
+    def _decode_column(self,
+                       stored: np.ndarray,
+                       field: str,
+                       coords: np.ndarray) -> np.ndarray:
+        """Decode stored values of a field of rows with the coordinates."""
+        codecs = self.column_codecs
+        if field not in codecs:
+            return stored
+        return codecs[field].decode_rows(self, field, stored, coords)
 
     def read(self,
              start: ty.Optional[int] = None,
@@ -195,11 +805,38 @@ class Table(BaseStoredObjectMapper):
         :type default: any type
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read(start, stop, step, field, out)
+        if self._existing_node:
+            if out is not None:
+                return self._read(start, stop, step, field, out)
+            return self._cached(
+                'read',
+                slice(start, stop, step).indices(self.nrows) + (field, ),
+                lambda: self._read(start, stop, step, field)
+            )
         else:
             return default
 
+    def _read(self,
+              start: ty.Optional[int],
+              stop: ty.Optional[int],
+              step: ty.Optional[int],
+              field: ty.Optional[str],
+              out: ty.Optional[np.ndarray] = None) -> ty.Any:
+        """Read and decode rows of the table."""
+        node = self.node
+        assert node is not None
+        if not self.column_codecs:
+            return node.read(start, stop, step, field, out)
+        start, stop, step = slice(start, stop, step).indices(self.nrows)
+        data = self._decode(
+            node.read(start, max(start, stop), field=field),
+            start, field
+        )[::step]
+        if out is None:
+            return data
+        out[...] = data
+        return out
+
     def read_where(self,
                    condition: str,
                    condvars: ty.Optional[ty.Dict] = None,
@@ -229,12 +866,42 @@ class Table(BaseStoredObjectMapper):
 
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read_where(condition, condvars, field, start,
+        if self._existing_node:
+            return self._cached(
+                'read_where',
+                _where_args(condition, condvars, field, start, stop, step),
+                lambda: self._read_where(condition, condvars, field, start,
                                          stop, step)
+            )
         else:
             return default
 
+    def _read_where(self,
+                    condition: str,
+                    condvars: ty.Optional[ty.Dict],
+                    field: ty.Optional[str],
+                    start: ty.Optional[int],
+                    stop: ty.Optional[int],
+                    step: int) -> ty.Any:
+        """Read and decode rows of the table fulfilling the condition."""
+        node = self.node
+        assert node is not None
+        codecs = self.column_codecs
+        if not codecs:
+            return node.read_where(condition, condvars, field, start, stop,
+                                   step)
+        names = set(compile(condition, '<condition>', 'eval').co_names)
+        encoded = sorted(
+            name for name in names - set(condvars or ())
+            if name in codecs and not codecs[name].QUERYABLE
+        )
+        if encoded:
+            raise ValueError(f'Condition {condition!r} refers to encoded '
+                             f'columns {encoded} of {self.node_path}')
+        coords = node.get_where_list(condition, condvars,
+                                     start=start, stop=stop, step=step)
+        return self._read_coordinates(coords, field)
+
 
 class Array(BaseStoredObjectMapper):
     """Mapping class for a pytables Array container."""
@@ -278,13 +945,176 @@ class Array(BaseStoredObjectMapper):
         :type default: any type.
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read(start, stop, step, out)
+        if self._existing_node:
+            return self._cached_read(start, stop, step, out)
         else:
             return default
 
 
-class CArray(BaseStoredObjectMapper):
+class ChunkedArray(BaseStoredObjectMapper):
+    """Base class for chunked arrays with chunk-aligned tile access.
+
+    Tiles are blocks of whole chunks, so reading or writing a tile touches
+    only chunks of the tile. Tiles on the upper bounds of the array may be
+    smaller than the tile shape.
+    """
+
+    @property
+    def shape(self) -> ty.Tuple[int, ...]:
+        """Return current shape of the node."""
+        node = self.node
+        assert node is not None
+        return tuple(node.shape)
+
+    def tile_grid(self,
+                  tile_shape: ty.Optional[ty.Sequence[int]] = None
+                  ) -> ty.Tuple[int, ...]:
+        """Return count of tiles along every axis.
+
+        :param tile_shape: shape of a tile, multiple of the chunkshape,
+            the chunkshape by default
+        """
+        tile_shape = self._tile_shape(tile_shape)
+        return tuple(-(-size // tile)
+                     for size, tile in zip(self.shape, tile_shape))
+
+    def iter_tiles(self,
+                   tile_shape: ty.Optional[ty.Sequence[int]] = None
+                   ) -> ty.Generator[ty.Tuple[ty.Tuple[int, ...], ty.Any],
+                                     None, None]:
+        """Iterate over (index, data) of all tiles in C order.
+
+        :param tile_shape: shape of a tile, multiple of the chunkshape,
+            the chunkshape by default
+        :rtype iterator of (tuple, numpy.ndarray):
+        """
+        tile_shape = self._tile_shape(tile_shape)
+        for idx in np.ndindex(*self.tile_grid(tile_shape)):
+            yield idx, self.read_tile(idx, tile_shape)
+
+    def read_tile(self,
+                  idx: ty.Sequence[int],
+                  tile_shape: ty.Optional[ty.Sequence[int]] = None) -> ty.Any:
+        """Read the tile with the given index in the tile grid.
+
+        :param idx: index of the tile along every axis
+        :param tile_shape: shape of a tile, multiple of the chunkshape,
+            the chunkshape by default
+        :rtype numpy.ndarray:
+        """
+        node = self.node
+        assert node is not None
+        return node[self._tile_slices(idx, tile_shape)]
+
+    def write_tile(self,
+                   idx: ty.Sequence[int],
+                   data: np.ndarray,
+                   tile_shape: ty.Optional[ty.Sequence[int]] = None) -> None:
+        """Overwrite the tile with the given index in the tile grid.
+
+        :param idx: index of the tile along every axis
+        :param data: values of the tile, clipped on the array bounds
+        :param tile_shape: shape of a tile, multiple of the chunkshape,
+            the chunkshape by default
+        """
+        slices = self._tile_slices(idx, tile_shape)
+        expected = tuple(item.stop - item.start for item in slices)
+        if np.shape(data) != expected:
+            raise ValueError(f'Tile {tuple(idx)} of {self.node_path} has '
+                             f'shape {expected}, got {np.shape(data)}')
+        self[slices] = data
+
+    def read_region(self,
+                    region: ty.Sequence[slice],
+                    out: ty.Optional[np.ndarray] = None) -> ty.Any:
+        """Read a window of the array chunk by chunk into one array.
+
+        Every chunk touched by the window is read once and only its part
+        inside the window is copied into the output.
+
+        :param region: slices with step 1 along the leading axes
+        :param out: an array to receive the output data
+        :type out: numpy.ndarray
+        :rtype numpy.ndarray:
+        """
+        shape = self.shape
+        bounds = []
+        for item, size in zip(region, shape):
+            start, stop, step = item.indices(size)
+            if step != 1:
+                raise ValueError('Region slices must have step 1')
+            bounds.append((start, max(start, stop)))
+        bounds += [(0, size) for size in shape[len(bounds):]]
+        if out is not None:
+            return self._read_region(bounds, out)
+        return self._cached('read_region', tuple(bounds),
+                            lambda: self._read_region(bounds))
+
+    def _read_region(self,
+                     bounds: ty.List[ty.Tuple[int, int]],
+                     out: ty.Optional[np.ndarray] = None) -> np.ndarray:
+        """Copy parts of chunks touched by the window into the output."""
+        node = self.node
+        assert node is not None
+        region_shape = tuple(stop - start for start, stop in bounds)
+        if out is None:
+            out = np.empty(region_shape, dtype=node.atom.dtype.base)
+        elif out.shape != region_shape:
+            raise ValueError(f'Output shape {out.shape} does not match '
+                             f'the region shape {region_shape}')
+        chunkshape = self._tile_shape(None)
+        ranges = [range(start // chunk * chunk, stop, chunk)
+                  for (start, stop), chunk in zip(bounds, chunkshape)]
+        for corner in itertools.product(*ranges):
+            source = tuple(
+                slice(max(first, start), min(first + chunk, stop))
+                for first, chunk, (start, stop)
+                in zip(corner, chunkshape, bounds)
+            )
+            target = tuple(
+                slice(item.start - start, item.stop - start)
+                for item, (start, _) in zip(source, bounds)
+            )
+            out[target] = node[source]
+        return out
+
+    def _tile_shape(self,
+                    tile_shape: ty.Optional[ty.Sequence[int]]
+                    ) -> ty.Tuple[int, ...]:
+        """Return the tile shape checked to be aligned with chunks."""
+        node = self.node
+        assert node is not None
+        chunkshape = tuple(node.chunkshape)
+        if tile_shape is None:
+            return chunkshape
+        tile_shape = tuple(tile_shape)
+        aligned = len(tile_shape) == len(chunkshape) and all(
+            tile > 0 and tile % chunk == 0
+            for tile, chunk in zip(tile_shape, chunkshape)
+        )
+        if not aligned:
+            raise ValueError(f'Tile shape {tile_shape} is not a multiple '
+                             f'of the chunkshape {chunkshape}')
+        return tile_shape
+
+    def _tile_slices(self,
+                     idx: ty.Sequence[int],
+                     tile_shape: ty.Optional[ty.Sequence[int]]
+                     ) -> ty.Tuple[slice, ...]:
+        """Return slices of the tile clipped on the array bounds."""
+        tile_shape = self._tile_shape(tile_shape)
+        grid = self.tile_grid(tile_shape)
+        idx = tuple(idx)
+        if len(idx) != len(grid) or not all(
+                0 <= index < count for index, count in zip(idx, grid)):
+            raise IndexError(f'Tile {idx} is out of the tile grid {grid}')
+        return tuple(
+            slice(index * tile, min((index + 1) * tile, size))
+            for index, tile, size in zip(idx, tile_shape, self.shape)
+        )
+
+
+class CArray(ChunkedArray):
     """Mapping class for a pytables CArray container."""
 
     ATOM: ty.Optional['tb.Atom'] = None
@@ -330,13 +1160,13 @@ class CArray(BaseStoredObjectMapper):
         :type default: any type.
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read(start, stop, step, out)
+        if self._existing_node:
+            return self._cached_read(start, stop, step, out)
         else:
             return default
 
 
-class EArray(BaseStoredObjectMapper):
+class EArray(ChunkedArray):
     """Mapping class for a pytables EArray container."""
 
     ATOM: ty.Optional['tb.Atom'] = None
@@ -347,10 +1177,7 @@ class EArray(BaseStoredObjectMapper):
 
     def append(self, sequence: np.ndarray) -> None:
         """Add a sequence of data to the end of the dataset."""
-        if self._node is None:
-            self.create()
-        self._node.append(sequence)
-        self._node.flush()
+        self._append(sequence)
 
     def create(self) -> None:
         """Create the EArray object in a store."""
@@ -370,6 +1197,8 @@ class EArray(BaseStoredObjectMapper):
             obj=self._obj,
             track_times=self._track_times
         )
+        if self.rollups is not None:
+            self.rollups.create(self)
 
     def read(self,
              start: ty.Optional[int] = None,
@@ -391,8 +1220,8 @@ class EArray(BaseStoredObjectMapper):
         :type default: any type.
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read(start, stop, step, out)
+        if self._existing_node:
+            return self._cached_read(start, stop, step, out)
         else:
             return default
 
@@ -405,12 +1234,13 @@ class VLArray(BaseStoredObjectMapper):
     EXPECTEDROWS: ty.Optional[int] = None
     FILTERS: ty.Optional['tb.Filters'] = None
 
-    def append(self, sequence: np.ndarray) -> None:
-        """Add a sequence of data to the end of the dataset."""
-        if self._node is None:
-            self.create()
-        self._node.append(sequence)
-        self._node.flush()
+    def append(self, sequence: ty.Any) -> None:
+        """Add a row to the end of the dataset.
+
+        Rows of variable length atoms (e.g. strings or objects) can not be
+        serialized to the journal, so they are appended directly.
+        """
+        self._append_rows(sequence)
 
     def create(self) -> None:
         """Create the VLArray object in a store."""
@@ -447,7 +1277,8 @@ class VLArray(BaseStoredObjectMapper):
         :type default: any type.
         :rtype numpy.ndarray:
         """
-        if self._node:
-            return self._node.read(start, stop, step)
+        node = self._existing_node
+        if node:
+            return node.read(start, stop, step)
         else:
             return default
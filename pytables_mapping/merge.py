@@ -0,0 +1,274 @@
+"""Merge of many store files of the same store class into one file.
+
+Appendable mappers (Table and EArray) of all sources are concatenated in
+order of sources, other mappers of the target are left as the store class
+creates them. Sources are read chunk by chunk through their mappers, so
+column codecs are decoded and encoded again, optionally in worker
+processes, while the current process writes the target with large appends.
+Workers read at most a few chunks ahead of the writer, every reader keeps
+a few sources open and closes a source after its last chunk.
+
+Tables sorted by a key in every source can be merged by the key instead:
+chunks of all sources are merged in a streaming k-way merge.
+"""
+from __future__ import annotations
+
+import collections
+import copy
+import itertools
+import multiprocessing
+import typing as ty
+
+import numpy as np
+
+from pytables_mapping import consts
+from pytables_mapping.mapping import BaseStoredObjectMapper
+from pytables_mapping.mapping import EArray
+from pytables_mapping.mapping import Table
+from pytables_mapping.parallel import imap_bounded
+from pytables_mapping.store import HDF5Store
+
+
+__all__ = [
+    'merge_stores',
+]
+
+
+StoreClass = ty.Type[HDF5Store]
+# store class, source path, mapper attribute, start, stop, the last chunk
+ChunkTask = ty.Tuple[StoreClass, str, str, int, int, bool]
+
+# count of sources kept open by a reader
+MAX_OPEN_SOURCES = 16
+
+
+def _detached(store_class: StoreClass,
+              create_params: ty.Optional[ty.Dict[str, ty.Dict]] = None
+              ) -> StoreClass:
+    """Return a subclass of the store class with copies of its mappers.
+
+    Mappers are class attributes bound to the last opened store, copies
+    let sources and the target be open at the same time.
+
+    :param store_class: the store class
+    :param create_params: extra create params by mapper attribute names
+    """
+    create_params = create_params or {}
+    mappers = {}
+    for attr in dir(store_class):
+        mapper = getattr(store_class, attr)
+        if isinstance(mapper, BaseStoredObjectMapper):
+            mapper = copy.copy(mapper)
+            mapper._create_params = {**mapper.create_params,
+                                     **create_params.get(attr, {})}
+            mappers[attr] = mapper
+    return type(store_class.__name__, (store_class, ), mappers)
+
+
+class _SourceReader:
+    """Reader of source chunks keeping recently read sources open."""
+
+    def __init__(self) -> None:
+        self._stores: ty.OrderedDict[ty.Tuple[StoreClass, str],
+                                     HDF5Store] = collections.OrderedDict()
+
+    def read(self, task: ChunkTask) -> np.ndarray:
+        """Read rows of a mapper of a source.
+
+        The source is closed after its last chunk, the least recently
+        read source is closed if too many sources are open.
+        """
+        store_class, path, attr, start, stop, last = task
+        store = self._stores.pop((store_class, path), None)
+        if store is None:
+            store = _detached(store_class)(path, mode='r')
+        try:
+            rows = getattr(store, attr)._read_rows(start, stop)
+        except BaseException:
+            store.close()
+            raise
+        if last:
+            store.close()
+            return rows
+        self._stores[(store_class, path)] = store
+        while len(self._stores) > MAX_OPEN_SOURCES:
+            self._stores.popitem(last=False)[1].close()
+        return rows
+
+    def close(self) -> None:
+        """Close all open sources."""
+        for store in self._stores.values():
+            store.close()
+        self._stores.clear()
+
+
+_READER: ty.Optional[_SourceReader] = None
+
+
+def _init_worker() -> None:
+    global _READER
+    _READER = _SourceReader()
+
+
+def _read_chunk(task: ChunkTask) -> np.ndarray:
+    assert _READER is not None
+    return _READER.read(task)
+
+
+def _layout(sources: ty.Sequence[str],
+            store_class: StoreClass) -> ty.Dict[str, ty.List[int]]:
+    """Check schemas of appendable mappers and return rows of sources.
+
+    :return: counts of rows of every source by mapper attribute names
+    """
+    layout: ty.Dict[str, ty.List[int]] = {}
+    schemas: ty.Dict[str, ty.Tuple[np.dtype, ty.Tuple[int, ...]]] = {}
+    for path in sources:
+        with _detached(store_class)(path, mode='r') as store:
+            for mapper in store.get_all_mappings():
+                if not isinstance(mapper, (Table, EArray)):
+                    continue
+                attr = next(attr for attr in dir(store)
+                            if getattr(store, attr) is mapper)
+                rows = layout.setdefault(attr, [])
+                if not mapper.exists:
+                    rows.append(0)
+                    continue
+                node = mapper.node
+                assert node is not None
+                schema = (mapper.dtype, tuple(node.shape[1:]))
+                if schemas.setdefault(attr, schema) != schema:
+                    raise ValueError(f'Schema of {mapper.node_path} in '
+                                     f'{path} differs from other sources')
+                rows.append(mapper.nrows)
+    return layout
+
+
+def _tasks(store_class: StoreClass,
+           path: str,
+           attr: str,
+           nrows: int,
+           chunk_size: int) -> ty.List[ChunkTask]:
+    """Return tasks reading chunks of a mapper of a source."""
+    return [(store_class, path, attr, start, min(start + chunk_size, nrows),
+             start + chunk_size >= nrows)
+            for start in range(0, nrows, chunk_size)]
+
+
+def _merge_sorted(chunks: ty.Sequence[ty.Iterator[np.ndarray]],
+                  key: str) -> ty.Iterator[np.ndarray]:
+    """Merge streams of chunks sorted by the key into one sorted stream.
+
+    Rows not greater than the smallest last key of buffered chunks can not
+    be preceded by unread rows, so they are merged and emitted.
+    """
+    buffers: ty.List[ty.Optional[np.ndarray]] = [None] * len(chunks)
+    last_keys: ty.List[ty.Any] = [None] * len(chunks)
+    while True:
+        for number, stream in enumerate(chunks):
+            buffer = buffers[number]
+            if buffer is not None and len(buffer):
+                continue
+            chunk = next(stream, None)
+            if chunk is None:
+                buffers[number] = None
+                continue
+            keys = chunk[key]
+            if len(keys):
+                previous = last_keys[number]
+                if previous is not None and keys[0] < previous or \
+                        np.any(keys[1:] < keys[:-1]):
+                    raise ValueError(f'Source {number} is not sorted by '
+                                     f'{key}')
+                last_keys[number] = keys[-1]
+            buffers[number] = chunk
+
+        active = [buffer for buffer in buffers if buffer is not None]
+        if not active:
+            return
+        frontier = min(buffer[key][-1] for buffer in active if len(buffer))
+        ready = []
+        for number, buffer in enumerate(buffers):
+            if buffer is None:
+                continue
+            split = np.searchsorted(buffer[key], frontier, side='right')
+            ready.append(buffer[:split])
+            buffers[number] = buffer[split:]
+        rows = np.concatenate(ready)
+        yield rows[np.argsort(rows[key], kind='stable')]
+
+
+def merge_stores(sources: ty.Sequence[str],
+                 target: str,
+                 store_class: StoreClass,
+                 processes: int = 0,
+                 chunk_size: int = consts.DEFAULT_BULK_CHUNK_ROWS,
+                 sort_by: ty.Optional[ty.Dict[str, str]] = None,
+                 mode: str = 'w') -> ty.Dict[str, int]:
+    """Concatenate appendable mappers of source stores into the target.
+
+    Schemas of mappers are checked in all sources before writing. Nodes of
+    the target are created with expected rows of the summed source rows.
+    Chunks are appended without flushing, every node is flushed once at
+    the end. The write-ahead journal of the target is bypassed.
+
+    :param sources: paths to source store files
+    :param target: path to the target store file
+    :param store_class: store class of sources and the target
+    :param processes: count of worker processes reading source chunks,
+        0 - read in the current process
+    :param chunk_size: count of rows read at once
+    :param sort_by: key columns by attribute names of table mappers that
+        are merged by the key, every source must be sorted by the key
+    :param mode: mode to open the target, 'a' appends to existing nodes
+    :return: counts of appended rows by mapper attribute names
+    """
+    sort_by = sort_by or {}
+    layout = _layout(sources, store_class)
+    unknown = set(sort_by) - set(layout)
+    if unknown:
+        raise ValueError(f'Unknown mappers to sort: {sorted(unknown)}')
+
+    target_class = _detached(store_class, {
+        attr: {'expectedrows': max(sum(rows), 1)}
+        for attr, rows in layout.items()
+    })
+    reader = _SourceReader()
+    pool = multiprocessing.Pool(processes, initializer=_init_worker) \
+        if processes else None
+    read = _read_chunk if pool else reader.read
+    window = processes * consts.BULK_CHUNKS_PER_PROCESS
+    result = {}
+    try:
+        with target_class(target, mode=mode) as store:
+            for attr, rows in layout.items():
+                tasks = [_tasks(store_class, path, attr, nrows, chunk_size)
+                         for path, nrows in zip(sources, rows)]
+                mapper = getattr(store, attr)
+                if not mapper.exists:
+                    mapper.create()
+                if attr in sort_by:
+                    # every source is read ahead, the merge takes chunks
+                    # of sources in an unknown order
+                    chunks = _merge_sorted(
+                        [imap_bounded(pool, read, source_tasks,
+                                      consts.BULK_CHUNKS_PER_PROCESS)
+                         for source_tasks in tasks],
+                        sort_by[attr]
+                    )
+                else:
+                    chunks = imap_bounded(pool, read,
+                                          itertools.chain(*tasks), window)
+                result[attr] = 0
+                for chunk in chunks:
+                    if len(chunk):
+                        mapper._append_rows(chunk, flush=False)
+                        result[attr] += len(chunk)
+                node = mapper.node
+                assert node is not None
+                node.flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        reader.close()
+    return result
@@ -0,0 +1,53 @@
+"""Ordered map over a pool of worker processes with bounded memory.
+
+``Pool.imap`` submits all tasks at once, so results of fast workers pile
+up in memory while the current process writes them. ``imap_bounded`` keeps
+at most *window* tasks submitted and not consumed yet.
+"""
+from __future__ import annotations
+
+import collections
+import itertools
+import typing as ty
+
+
+if ty.TYPE_CHECKING:
+    import multiprocessing.pool
+
+
+__all__ = [
+    'imap_bounded',
+]
+
+
+Task = ty.TypeVar('Task')
+Result = ty.TypeVar('Result')
+
+
+def imap_bounded(pool: ty.Optional['multiprocessing.pool.Pool'],
+                 function: ty.Callable[[Task], Result],
+                 tasks: ty.Iterable[Task],
+                 window: int) -> ty.Iterator[Result]:
+    """Yield results of the function over tasks in order of tasks.
+
+    :param pool: pool of worker processes, None - run in the current
+        process
+    :param function: picklable function of a task
+    :param tasks: tasks, consumed lazily as results are consumed
+    :param window: maximal count of tasks in flight
+    """
+    tasks = iter(tasks)
+    if pool is None:
+        yield from map(function, tasks)
+        return
+
+    pending: ty.Deque['multiprocessing.pool.AsyncResult[Result]'] = \
+        collections.deque()
+    for task in itertools.islice(tasks, max(window, 1)):
+        pending.append(pool.apply_async(function, (task, )))
+    while pending:
+        result = pending.popleft().get()
+        # the next task runs while the result is consumed
+        for task in itertools.islice(tasks, 1):
+            pending.append(pool.apply_async(function, (task, )))
+        yield result
@@ -0,0 +1,98 @@
+"""HDF5 tuning profiles of stores.
+
+A profile sets PyTables open parameters: the HDF5 chunk cache of datasets,
+the node cache slots, the file driver and the count of blosc threads.
+Parameters left None keep PyTables defaults. PyTables sets the blosc thread
+count process-wide on every open, so the last opened file wins.
+
+Named profiles:
+
+* 'default' - PyTables defaults;
+* 'random-read' - a large chunk cache with many slots and node cache for
+  point reads scattered over the file;
+* 'sequential-scan' - chunks read through are evicted first, compression
+  runs in all cores;
+* 'bulk-write' - a large chunk cache holding partially written chunks,
+  compression runs in all cores;
+* 'in-memory' - the whole file lives in RAM (H5FD_CORE driver) and is
+  written back on close if the store is writable.
+"""
+from __future__ import annotations
+
+import os
+import typing as ty
+
+
+__all__ = [
+    'PROFILES',
+    'StoreProfile',
+    'resolve_profile',
+]
+
+
+class StoreProfile(ty.NamedTuple):
+    """Open parameters of a store, None - the PyTables default."""
+
+    chunk_cache_size: ty.Optional[int] = None
+    chunk_cache_nelmts: ty.Optional[int] = None
+    chunk_cache_preempt: ty.Optional[float] = None
+    node_cache_slots: ty.Optional[int] = None
+    driver: ty.Optional[str] = None
+    driver_core_backing_store: ty.Optional[bool] = None
+    blosc_threads: ty.Optional[int] = None
+
+    def open_params(self) -> ty.Dict[str, ty.Any]:
+        """Return parameters of tables.open_file set by the profile."""
+        params = {
+            'chunk_cache_size': self.chunk_cache_size,
+            'chunk_cache_nelmts': self.chunk_cache_nelmts,
+            'chunk_cache_preempt': self.chunk_cache_preempt,
+            'node_cache_slots': self.node_cache_slots,
+            'driver': self.driver,
+            'driver_core_backing_store': self.driver_core_backing_store,
+            'max_blosc_threads': self.blosc_threads,
+        }
+        return {name: value for name, value in params.items()
+                if value is not None}
+
+
+CORES = os.cpu_count() or 1
+
+PROFILES = {
+    'default': StoreProfile(),
+    'random-read': StoreProfile(
+        chunk_cache_size=64 * 1024 * 1024,
+        chunk_cache_nelmts=10007,
+        chunk_cache_preempt=0.0,
+        node_cache_slots=256,
+        blosc_threads=1,
+    ),
+    'sequential-scan': StoreProfile(
+        chunk_cache_size=32 * 1024 * 1024,
+        chunk_cache_preempt=1.0,
+        blosc_threads=CORES,
+    ),
+    'bulk-write': StoreProfile(
+        chunk_cache_size=256 * 1024 * 1024,
+        chunk_cache_nelmts=10007,
+        chunk_cache_preempt=1.0,
+        blosc_threads=CORES,
+    ),
+    'in-memory': StoreProfile(
+        driver='H5FD_CORE',
+        driver_core_backing_store=True,
+    ),
+}
+
+
+def resolve_profile(profile: ty.Union[str, StoreProfile]) -> StoreProfile:
+    """Return the profile by name or the given profile itself.
+
+    :param profile: name of a profile in PROFILES or a StoreProfile
+    """
+    if isinstance(profile, StoreProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown store profile {profile!r}, '
+                         f'known profiles: {sorted(PROFILES)}')
+    return PROFILES[profile]
@@ -0,0 +1,266 @@
+"""Multi-resolution rollups of Table and EArray mappers.
+
+Every rollup level aggregates buckets of *factor* consecutive rows into one
+row of a sibling Table named ``<object name>_rollup_<factor>`` under the
+same FULL_NODE_PATH. Levels are updated incrementally on every append: the
+last, partially filled bucket is merged with new rows. Buckets with rows
+overwritten in place are recomputed from the rows.
+
+Rollup rows have the 'row' field with the first row of the bucket and a
+field per statistic ('min', 'max', 'mean', 'count'), prefixed with the
+column name for tables, e.g. 'price_mean'.
+"""
+from __future__ import annotations
+
+import typing as ty
+
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+    import tables as tb
+else:
+    np = LazyModule('numpy')
+
+
+__all__ = [
+    'Rollups',
+]
+
+
+STATS = ('min', 'max', 'mean', 'count')
+
+
+class Rollups:
+    """Declaration of rollup levels of a mapper."""
+
+    def __init__(self,
+                 factors: ty.Sequence[int] = (10, 100, 1000),
+                 stats: ty.Sequence[str] = STATS,
+                 columns: ty.Optional[ty.Sequence[str]] = None) -> None:
+        """Initialize the declaration.
+
+        :param factors: count of rows aggregated into one row of every level
+        :param stats: statistics of levels: 'min', 'max', 'mean', 'count'
+        :param columns: table columns to aggregate, all numeric by default
+        """
+        unknown = set(stats) - set(STATS)
+        if unknown:
+            raise ValueError(f'Unknown rollup statistics: {sorted(unknown)}')
+        self.factors = tuple(sorted(factors))
+        self.stats = tuple(stat for stat in STATS if stat in stats)
+        self.columns = columns
+
+    def node_name(self, mapper: ty.Any, factor: int) -> str:
+        """Return name of the rollup level node."""
+        return f'{mapper.name}_rollup_{factor}'
+
+    def level(self, mapper: ty.Any, factor: int) -> 'tb.Table':
+        """Return node of the rollup level."""
+        return mapper._store.get_node(mapper.node._v_parent,
+                                      self.node_name(mapper, factor))
+
+    def create(self, mapper: ty.Any) -> None:
+        """Create nodes of rollup levels next to the mapper node."""
+        dtype = self._stored_dtype(mapper)
+        for factor in self.factors:
+            mapper._store.create_table(
+                mapper.node._v_parent, self.node_name(mapper, factor),
+                description=dtype, filters=mapper.node.filters
+            )
+
+    def remove(self, mapper: ty.Any) -> None:
+        """Remove nodes of rollup levels."""
+        for factor in self.factors:
+            mapper._store.remove_node(mapper.node._v_parent,
+                                      self.node_name(mapper, factor))
+
+    def update(self,
+               mapper: ty.Any,
+               rows: np.ndarray,
+               start: int,
+               flush: bool = True) -> None:
+        """Aggregate rows appended at *start* row into every level.
+
+        :param mapper: the mapper rows are appended to
+        :param rows: appended rows as they are read from the mapper
+        :param start: the first row of appended rows
+        :param flush: if True - levels are flushed
+        """
+        if not len(rows):
+            return
+        for factor in self.factors:
+            level = self.level(mapper, factor)
+            aggregated = self._aggregated(mapper, level.dtype, rows, start,
+                                          factor)
+            first_bucket = start // factor
+            if level.nrows > first_bucket:
+                level.modify_rows(
+                    first_bucket, first_bucket + 1,
+                    rows=self._merge(level.read(first_bucket,
+                                                first_bucket + 1),
+                                     aggregated[:1])
+                )
+                aggregated = aggregated[1:]
+            level.append(aggregated)
+            if flush:
+                level.flush()
+
+    def refresh(self, mapper: ty.Any, coords: np.ndarray) -> None:
+        """Recompute buckets of every level with rows overwritten in place.
+
+        :param mapper: the mapper rows are overwritten in
+        :param coords: coordinates of overwritten rows
+        """
+        if not len(coords):
+            return
+        nrows = mapper.nrows
+        for factor in self.factors:
+            level = self.level(mapper, factor)
+            buckets = np.unique(coords // factor)
+            # consecutive buckets are recomputed at once
+            bounds = np.flatnonzero(np.diff(buckets) > 1) + 1
+            for run in np.split(buckets, bounds):
+                first, last = int(run[0]), int(run[-1]) + 1
+                start = first * factor
+                rows = mapper._read_rows(start, min(last * factor, nrows))
+                level.modify_rows(first, last, rows=self._aggregated(
+                    mapper, level.dtype, rows, start, factor
+                ))
+
+    def read(self,
+             mapper: ty.Any,
+             start: int,
+             stop: int,
+             max_points: int) -> np.ndarray:
+        """Read aggregated rows of the coarsest adequate level.
+
+        The finest level with at most *max_points* buckets in the range is
+        used, raw rows are used if there are not more than *max_points*
+        of them. Buckets on the range bounds cover rows out of the range.
+        """
+        nrows = stop - start
+        factor = 1
+        for candidate in (1, ) + self.factors:
+            factor = candidate
+            if -(-nrows // candidate) <= max_points:
+                break
+
+        if factor == 1:
+            return self._raw_level(mapper, mapper._read_rows(start, stop),
+                                   start)
+        stored = self.level(mapper, factor).read(start // factor,
+                                                 -(-stop // factor))
+        return self._output(mapper, stored)
+
+    def _columns(self,
+                 mapper: ty.Any) -> ty.List[ty.Tuple[ty.Optional[str], str]]:
+        dtype = mapper.dtype
+        if dtype.names is None:
+            return [(None, '')]
+        columns = self.columns or [
+            name for name in dtype.names
+            if dtype[name].kind in 'iufb' and dtype[name].shape == ()
+        ]
+        return [(column, f'{column}_') for column in columns]
+
+    def _stored_fields(self, mapper: ty.Any) -> ty.List[ty.Any]:
+        dtype = mapper.dtype
+        row_shape = tuple(mapper.node.shape[1:])
+        fields: ty.List[ty.Any] = []
+        for column, prefix in self._columns(mapper):
+            base = dtype[column].base if column else dtype.base
+            shape = () if column else row_shape
+            if 'min' in self.stats:
+                fields.append((f'{prefix}min', base, shape))
+            if 'max' in self.stats:
+                fields.append((f'{prefix}max', base, shape))
+            if 'mean' in self.stats:
+                fields.append((f'{prefix}sum', np.float64, shape))
+        return fields
+
+    def _stored_dtype(self, mapper: ty.Any) -> np.dtype:
+        fields: ty.List[ty.Any] = [('row', np.int64), ('count', np.int64)]
+        return np.dtype(fields + self._stored_fields(mapper))
+
+    def _output_dtype(self, mapper: ty.Any) -> np.dtype:
+        fields: ty.List[ty.Any] = [('row', np.int64)]
+        if 'count' in self.stats:
+            fields.append(('count', np.int64))
+        for name, base, shape in self._stored_fields(mapper):
+            if name.endswith('sum'):
+                fields.append((name[:-3] + 'mean', np.float64, shape))
+            else:
+                fields.append((name, base, shape))
+        return np.dtype(fields)
+
+    def _aggregated(self,
+                    mapper: ty.Any,
+                    dtype: np.dtype,
+                    rows: np.ndarray,
+                    start: int,
+                    factor: int) -> np.ndarray:
+        buckets = (start + np.arange(len(rows))) // factor
+        bounds = np.flatnonzero(np.diff(buckets)) + 1
+        offsets = np.concatenate([[0], bounds])
+        counts = np.diff(np.concatenate([offsets, [len(rows)]]))
+
+        aggregated = np.empty(len(offsets), dtype=dtype)
+        aggregated['row'] = buckets[offsets] * factor
+        aggregated['count'] = counts
+        for column, prefix in self._columns(mapper):
+            values = rows[column] if column else rows
+            self._aggregate(aggregated, prefix, values, offsets)
+        return aggregated
+
+    def _aggregate(self,
+                   aggregated: np.ndarray,
+                   prefix: str,
+                   values: np.ndarray,
+                   offsets: np.ndarray) -> None:
+        if 'min' in self.stats:
+            aggregated[f'{prefix}min'] = np.minimum.reduceat(values, offsets)
+        if 'max' in self.stats:
+            aggregated[f'{prefix}max'] = np.maximum.reduceat(values, offsets)
+        if 'mean' in self.stats:
+            aggregated[f'{prefix}sum'] = np.add.reduceat(
+                values.astype(np.float64), offsets
+            )
+
+    def _merge(self, stored: np.ndarray, new: np.ndarray) -> np.ndarray:
+        merged = stored.copy()
+        for name in stored.dtype.names or ():
+            if name.endswith('min'):
+                merged[name] = np.minimum(stored[name], new[name])
+            elif name.endswith('max'):
+                merged[name] = np.maximum(stored[name], new[name])
+            elif name.endswith('sum') or name == 'count':
+                merged[name] = stored[name] + new[name]
+        return merged
+
+    def _raw_level(self,
+                   mapper: ty.Any,
+                   rows: np.ndarray,
+                   start: int) -> np.ndarray:
+        stored = np.empty(len(rows), dtype=self._stored_dtype(mapper))
+        stored['row'] = np.arange(start, start + len(rows))
+        stored['count'] = 1
+        for column, prefix in self._columns(mapper):
+            values = rows[column] if column else rows
+            for stat in ('min', 'max', 'sum'):
+                if f'{prefix}{stat}' in stored.dtype.names:
+                    stored[f'{prefix}{stat}'] = values
+        return self._output(mapper, stored)
+
+    def _output(self, mapper: ty.Any, stored: np.ndarray) -> np.ndarray:
+        result = np.empty(len(stored), dtype=self._output_dtype(mapper))
+        for name in result.dtype.names:
+            if name.endswith('mean'):
+                count = stored['count'].reshape(
+                    (-1, ) + (1, ) * (stored[name[:-4] + 'sum'].ndim - 1)
+                )
+                result[name] = stored[name[:-4] + 'sum'] / count
+            else:
+                result[name] = stored[name]
+        return result
@@ -0,0 +1,188 @@
+"""Chunk-aware random sampling of rows of mappers.
+
+Strategies:
+
+* 'exact' - a uniform sample without replacement. The node size is known,
+  so sampled rows are drawn up front and the node is streamed chunk by
+  chunk reading only chunks that contain sampled rows, every chunk once;
+* 'chunks' - an approximate sample reading a random subset of whole
+  chunks, as many as needed to hold *n* rows, and subsampling them. It is
+  as fast as reading *n* rows sequentially, but rows of a chunk are
+  sampled together.
+
+Stratification by a table column keeps the shares of the column values:
+every value gets a number of rows proportional to its count (largest
+remainder rounding). The exact mode counts values in an extra pass over
+the column, the approximate mode uses counts of the read chunks.
+"""
+from __future__ import annotations
+
+import typing as ty
+
+from pytables_mapping.lazy import LazyModule
+
+
+if ty.TYPE_CHECKING:
+    import numpy as np
+else:
+    np = LazyModule('numpy')
+
+
+__all__ = [
+    'STRATEGIES',
+    'sample',
+]
+
+
+STRATEGIES = ('exact', 'chunks')
+
+
+def sample(mapper: ty.Any,
+           n: int,
+           seed: ty.Optional[int] = None,
+           strategy: str = 'exact',
+           stratify: ty.Optional[str] = None,
+           chunk_size: ty.Optional[int] = None) -> np.ndarray:
+    """Return a random sample of rows of the mapper in storage order.
+
+    :param mapper: the mapper to sample, variable length arrays are not
+        supported
+    :param n: count of sampled rows, all rows if the node has fewer rows
+    :param seed: seed of the random generator, the same seed gives the
+        same sample of the same data
+    :param strategy: 'exact' or 'chunks'
+    :param stratify: table column to stratify the sample by
+    :param chunk_size: count of rows read at once, by default the chunk
+        size of the node
+    :rtype numpy.ndarray:
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Unknown sampling strategy {strategy!r}')
+    if stratify is not None and stratify not in (mapper.dtype.names or ()):
+        raise ValueError(f'Unknown column {stratify!r} to stratify by')
+    rng = np.random.default_rng(seed)
+    nrows = mapper.nrows
+    n = min(n, nrows)
+    chunk_size = chunk_size or mapper.chunk_rows
+
+    if strategy == 'chunks':
+        return _sample_chunks(mapper, rng, n, stratify, chunk_size)
+    if stratify is not None:
+        return _sample_strata(mapper, rng, n, stratify, chunk_size)
+    coords = np.sort(rng.choice(nrows, n, replace=False))
+    return _read_coordinates(mapper, coords, chunk_size)
+
+
+def _allocate(counts: np.ndarray, n: int) -> np.ndarray:
+    """Split *n* rows between strata proportionally to their counts."""
+    quotas = counts * (n / max(counts.sum(), 1))
+    allocated = np.floor(quotas).astype(np.int64)
+    remainder = n - allocated.sum()
+    order = np.argsort(allocated - quotas, kind='stable')
+    allocated[order[:remainder]] += 1
+    return np.minimum(allocated, counts)
+
+
+def _choice(rng: np.random.Generator,
+            values: np.ndarray,
+            n: int,
+            stratified: bool) -> np.ndarray:
+    """Return sorted indices of *n* random values, stratified if asked."""
+    if not stratified:
+        return np.sort(rng.choice(len(values), n, replace=False))
+    _, inverse, counts = np.unique(values, return_inverse=True,
+                                   return_counts=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.cumsum(counts) - counts
+    chosen = [
+        order[start + rng.choice(count, size, replace=False)]
+        for start, count, size in zip(starts, counts,
+                                      _allocate(counts, n))
+    ]
+    if not chosen:
+        return np.empty(0, dtype=np.int64)
+    return np.sort(np.concatenate(chosen))
+
+
+def _read_coordinates(mapper: ty.Any,
+                      coords: np.ndarray,
+                      chunk_size: int) -> np.ndarray:
+    """Read rows with sorted coordinates reading every chunk once."""
+    parts = []
+    chunks = coords // chunk_size
+    bounds = np.flatnonzero(np.diff(chunks)) + 1
+    for selected in np.split(coords, bounds):
+        if not selected.size:
+            continue
+        start = int(selected[0]) // chunk_size * chunk_size
+        rows = mapper._read_rows(start, min(start + chunk_size, mapper.nrows))
+        parts.append(rows[selected - start])
+    if not parts:
+        return mapper._read_rows(0, 0)
+    return np.concatenate(parts)
+
+
+def _sample_chunks(mapper: ty.Any,
+                   rng: np.random.Generator,
+                   n: int,
+                   stratify: ty.Optional[str],
+                   chunk_size: int) -> np.ndarray:
+    """Sample rows of a random subset of whole chunks."""
+    nrows = mapper.nrows
+    count = -(-nrows // chunk_size)
+    chunks = rng.permutation(count)
+    needed = np.searchsorted(
+        np.cumsum(np.minimum(nrows - chunks * chunk_size, chunk_size)), n
+    ) + 1
+    parts = [
+        mapper._read_rows(start, min(start + chunk_size, nrows))
+        for start in np.sort(chunks[:needed]) * chunk_size
+    ]
+    rows = np.concatenate(parts) if parts else mapper._read_rows(0, 0)
+    values = rows[stratify] if stratify is not None else rows
+    return rows[_choice(rng, values, n, stratify is not None)]
+
+
+def _sample_strata(mapper: ty.Any,
+                   rng: np.random.Generator,
+                   n: int,
+                   stratify: str,
+                   chunk_size: int) -> np.ndarray:
+    """Exactly sample rows of every stratum in two passes over the node."""
+    nrows = mapper.nrows
+    strata = np.empty(0, dtype=mapper.dtype[stratify])
+    counts = np.empty(0, dtype=np.int64)
+    for start in range(0, nrows, chunk_size):
+        values, value_counts = np.unique(
+            mapper._read_rows(start, min(start + chunk_size, nrows))[stratify],
+            return_counts=True
+        )
+        strata, inverse = np.unique(np.concatenate([strata, values]),
+                                    return_inverse=True)
+        counts = np.bincount(
+            inverse.reshape(-1),
+            weights=np.concatenate([counts, value_counts]),
+        ).astype(np.int64)
+
+    # sorted ranks of sampled rows among rows of every stratum
+    ranks = [np.sort(rng.choice(count, size, replace=False))
+             for count, size in zip(counts, _allocate(counts, n))]
+    seen = np.zeros(len(strata), dtype=np.int64)
+    parts = []
+    for start in range(0, nrows, chunk_size):
+        rows = mapper._read_rows(start, min(start + chunk_size, nrows))
+        indices = np.searchsorted(strata, rows[stratify])
+        selected = []
+        for index in np.unique(indices):
+            positions = np.flatnonzero(indices == index)
+            stratum_ranks = ranks[index]
+            low, high = np.searchsorted(
+                stratum_ranks, [seen[index], seen[index] + len(positions)]
+            )
+            offsets = stratum_ranks[low:high] - seen[index]
+            selected.append(positions[offsets])
+            seen[index] += len(positions)
+        parts.append(rows[np.sort(np.concatenate(selected))])
+    if not parts:
+        return mapper._read_rows(0, 0)
+    return np.concatenate(parts)
@@ -4,9 +4,19 @@ from __future__ import annotations
 import os
 import typing as ty
 
-import tables as tb
-
+from pytables_mapping import consts
+from pytables_mapping.cache import ResultCache
+from pytables_mapping.journal import Journal
+from pytables_mapping.lazy import LazyModule
 from pytables_mapping.mapping import BaseStoredObjectMapper
+from pytables_mapping.profiles import StoreProfile
+from pytables_mapping.profiles import resolve_profile
+
+
+if ty.TYPE_CHECKING:
+    import tables as tb
+else:
+    tb = LazyModule('tables')
 
 
 T = ty.TypeVar('T', bound='HDF5Store')
@@ -17,31 +27,108 @@ class HDF5Store:
 
     STORE_VERSION: ty.Optional[ty.Any] = None
 
-    def __init__(self, filename: str, mode: str = 'r') -> None:
+    # write-ahead journal options, see pytables_mapping.journal
+    JOURNAL: bool = False
+    JOURNAL_COMMIT_SIZE: int = consts.DEFAULT_JOURNAL_COMMIT_SIZE
+    JOURNAL_FSYNC: bool = False
+
+    # size of the read results cache in bytes, 0 - disabled,
+    # see pytables_mapping.cache
+    CACHE_SIZE: int = 0
+
+    # HDF5 tuning profile: a name or a StoreProfile,
+    # see pytables_mapping.profiles
+    PROFILE: ty.Union[str, StoreProfile] = 'default'
+
+    def __init__(self,
+                 filename: str,
+                 mode: str = 'r',
+                 journal: ty.Optional[bool] = None,
+                 cache_size: ty.Optional[int] = None,
+                 profile: ty.Optional[ty.Union[str, StoreProfile]] = None
+                 ) -> None:
         """Initialize the store object.
 
         :param filename: The name of the file
         :param mode: The mode to open the file.
+        :param journal: if True - appended data goes through the write-ahead
+            journal, by default the JOURNAL class attribute is used
+        :param cache_size: size of the read results cache in bytes,
+            by default the CACHE_SIZE class attribute is used
+        :param profile: HDF5 tuning profile, a name or a StoreProfile,
+            by default the PROFILE class attribute is used
         """
         assert isinstance(filename, str), type(filename)
-        self._hdf_store = tb.open_file(filename, mode=mode)
-        self._reset()
+        self._use_journal = self.JOURNAL if journal is None else journal
+        self._journal: ty.Optional[Journal] = None
+        cache_size = self.CACHE_SIZE if cache_size is None else cache_size
+        self._cache = ResultCache(cache_size) if cache_size else None
+        self._profile = resolve_profile(
+            self.PROFILE if profile is None else profile
+        )
+        self._open(filename, mode)
         super().__init__()
 
+    def _open(self, filename: str, mode: str) -> None:
+        """Open the main storage file and bind mappers to it.
+
+        The file is closed again if mappers can not be bound.
+        """
+        self._hdf_store = self._open_file(filename, mode)
+        try:
+            self._reset()
+        except BaseException:
+            if self._journal is not None:
+                self._journal.close(commit=False)
+            self._hdf_store.close()
+            raise
+
+    def _open_file(self, filename: str, mode: str) -> 'tb.File':
+        """Open the main storage file with parameters of the profile."""
+        return tb.open_file(filename, mode=mode,
+                            **self._profile.open_params())
+
     def _reset(self) -> None:
-        for obj in self.get_all_mappings():
-            obj.reset_store(self._hdf_store)
-            if self.is_writable:
+        if self.is_writable and self._use_journal:
+            self._journal = Journal(
+                self.filename + consts.DEFAULT_JOURNAL_SUFFIX,
+                self._hdf_store,
+                commit_size=self.JOURNAL_COMMIT_SIZE,
+                fsync=self.JOURNAL_FSYNC,
+                truncate=self._hdf_store.mode == 'w'
+            )
+        else:
+            self._journal = None
+
+        mappings = self.get_all_mappings()
+        for obj in mappings:
+            obj.reset_store(self._hdf_store, self._journal, self._cache)
+            if self.is_writable and (obj._overwrite or not obj.exists):
                 obj.create()
 
-    def reopen(self, filename: str, mode: str = 'r') -> None:
+        if self._journal is not None:
+            self._journal.replay(mappings)
+
+    def reopen(self,
+               filename: str,
+               mode: str = 'r',
+               profile: ty.Optional[ty.Union[str, StoreProfile]] = None
+               ) -> None:
         """Reopen main storage with new path and/or mode.
 
+        The previously opened file is closed.
+
         :param filename: The name of the file
         :param mode: The mode to open the file.
+        :param profile: new HDF5 tuning profile, by default the current
+            profile is kept
         """
-        self._hdf_store = tb.open_file(filename, mode=mode)
-        self._reset()
+        self.close()
+        if self._cache is not None:
+            self._cache.clear()
+        if profile is not None:
+            self._profile = resolve_profile(profile)
+        self._open(filename, mode)
 
     @property
     def filename(self) -> str:
@@ -51,6 +138,11 @@ class HDF5Store:
         """
         return self._hdf_store.filename
 
+    @property
+    def profile(self) -> StoreProfile:
+        """Return the HDF5 tuning profile of the store."""
+        return self._profile
+
     @property
     def is_writable(self) -> bool:
         """Run True if is the main storage file writable.
@@ -59,6 +151,16 @@ class HDF5Store:
         """
         return self._hdf_store._iswritable()
 
+    @property
+    def journal(self) -> ty.Optional[Journal]:
+        """Return the write-ahead journal if it is enabled."""
+        return self._journal
+
+    @property
+    def cache(self) -> ty.Optional[ResultCache]:
+        """Return the read results cache if it is enabled."""
+        return self._cache
+
     @property
     def attrs(self) -> 'tb.attributeset.AttributeSet':
         """Return hdf store root attributes object.
@@ -87,15 +189,28 @@ class HDF5Store:
         self.close()
 
     def close(self) -> None:
-        """Close the main storage file."""
-        if self._hdf_store.isopen:
-            if self._hdf_store._iswritable():
-                self.attrs.STORE_VERSION = self.STORE_VERSION
-                self._hdf_store.flush()
-            self._hdf_store.close()
+        """Close the main storage file.
+
+        The file is closed even if the journal commit fails, the failed
+        records are replayed on the next open.
+        """
+        try:
+            if self._journal is not None:
+                self._journal.close()
+        finally:
+            if self._hdf_store.isopen:
+                if self._hdf_store._iswritable():
+                    self.attrs.STORE_VERSION = self.STORE_VERSION
+                    self._hdf_store.flush()
+                self._hdf_store.close()
 
     def flush(self) -> None:
-        """Flush all main store objects to disk."""
+        """Flush all main store objects to disk.
+
+        Pending data of the write-ahead journal is committed as well.
+        """
+        if self._journal is not None:
+            self._journal.commit()
         self._hdf_store.flush()
 
     def remove(self) -> None:
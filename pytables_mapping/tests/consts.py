@@ -62,3 +62,18 @@ TEST_ANY_ARRAY_SHAPE = (TEST_ANY_ARRAY_EXPECTED_ROWS, )
 TEST_ANY_ARRAY = array([4, 6, 9, 10, 14, 15, 21, 22, 25], TEST_ANY_ARRAY_DTYPE)
 TEST_ANY_ARRAY_AS_LIST = list(TEST_ANY_ARRAY)
 TEST_ANY_ARRAY_LENGTH = len(TEST_ANY_ARRAY)
+TEST_JOURNAL_FILE_NAME = '_temporary_journal_test.h5'
+TEST_EXPORT_FILE_NAME = '_temporary_export_test.h5'
+TEST_EXPORT_ARROW_FILE_NAME = '_temporary_export_test.arrow'
+TEST_LOADER_FILE_NAME = '_temporary_loader_test.h5'
+TEST_LOADER_SOURCE_NAME = '_temporary_loader_source'
+TEST_CODECS_FILE_NAME = '_temporary_codecs_test.h5'
+TEST_CACHE_FILE_NAME = '_temporary_cache_test.h5'
+TEST_ROLLUPS_FILE_NAME = '_temporary_rollups_test.h5'
+TEST_KEYS_FILE_NAME = '_temporary_keys_test.h5'
+TEST_PROFILES_FILE_NAME = '_temporary_profiles_test.h5'
+TEST_TILES_FILE_NAME = '_temporary_tiles_test.h5'
+TEST_JOIN_FILE_NAME = '_temporary_join_test.h5'
+TEST_SAMPLING_FILE_NAME = '_temporary_sampling_test.h5'
+TEST_MERGE_FILE_NAME = '_temporary_merge_test.h5'
+TEST_MERGE_SOURCE_NAME = '_temporary_merge_source_{}.h5'
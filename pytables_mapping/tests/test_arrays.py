@@ -104,6 +104,18 @@ class EArraysMappingTestCase(CustomTestCase):
             self.assertEqual(data1, TEST_ANY_ARRAY_AS_LIST)
             self.assertEqual(data2, TEST_ANY_ARRAY_AS_LIST)
 
+    def test_tail(self) -> None:
+        with TestEArrayStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.earray.append(TEST_ANY_ARRAY)
+            offset = TEST_ANY_ARRAY_LENGTH
+            store.earray.set_tail_offset('test', offset)
+            store.earray.append(TEST_ANY_ARRAY)
+            data = [list(batch) for batch in
+                    store.earray.tail(consumer='test', chunk_size=5)]
+            self.assertEqual(sum(data, []), TEST_ANY_ARRAY_AS_LIST)
+            self.assertEqual(store.earray.get_tail_offset('test'),
+                             2 * TEST_ANY_ARRAY_LENGTH)
+
 
 class VLArraysMappingTestCase(CustomTestCase):
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping.cache import ResultCache
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+from pytables_mapping.tests.test_table import PythagoreanTriplesTable
+import pytables_mapping as mapping
+
+
+class TestCacheStore(mapping.HDF5Store):
+
+    CACHE_SIZE = 1024 * 1024
+
+    table = PythagoreanTriplesTable()
+    earray = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0,))
+
+
+class ResultCacheTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_CACHE_FILE_NAME
+
+    def test_store_cache(self) -> None:
+        with TestCacheStore(self.TEST_FILE_NAME, mode='w') as store:
+            assert store.cache
+            store.table.append(TEST_TABLE)
+            data = store.table.read_where('A > 20')
+            self.assertIs(store.table.read_where(' A > 20 '), data)
+            self.assertFalse(data.flags.writeable)
+            self.assertIsNot(store.table.read_where('A > x', {'x': 20}),
+                             data)
+            self.assertIs(store.table.read_where('A > x', {'x': 20}),
+                          store.table.read_where('A > x', {'x': 20}))
+
+            data = store.table.read(0, 10)
+            self.assertIs(store.table.read(stop=10), data)
+            store.table[0] = TEST_TABLE_ROW
+            self.assertEqual(tuple(store.table.read(0, 10)[0]),
+                             TEST_TABLE_ROW)
+
+            store.earray.append(TEST_ANY_ARRAY)
+            data = store.earray.read()
+            store.earray.append(TEST_ANY_ARRAY)
+            self.assertEqual(len(store.earray.read()),
+                             2 * TEST_ANY_ARRAY_LENGTH)
+            assert_array_equal(store.earray.read(0, TEST_ANY_ARRAY_LENGTH),
+                               data)
+
+            stats = store.cache.stats
+            self.assertEqual(stats.hits, 4)
+            self.assertEqual(stats.misses, 7)
+            self.assertAlmostEqual(stats.hit_rate, 4 / 11)
+
+        with TestCacheStore(self.TEST_FILE_NAME, cache_size=0) as store:
+            self.assertIsNone(store.cache)
+            self.assertTrue(store.table.read().flags.writeable)
+
+    def test_streaming_bypass(self) -> None:
+        with TestCacheStore(self.TEST_FILE_NAME, mode='w') as store:
+            assert store.cache
+            store.table.append(TEST_TABLE)
+            batches = list(store.table.tail(chunk_size=4))
+            self.assertTrue(all(batch.flags.writeable for batch in batches))
+            self.assertEqual(len(store.table.sample(5, stratify='A')), 5)
+            self.assertEqual(store.cache.stats.entries, 0)
+            self.assertEqual(store.cache.stats.misses, 0)
+
+    def test_eviction(self) -> None:
+        cache = ResultCache(100)
+        for index in range(3):
+            cache.get(('/node', 0, 'read', (index, )),
+                      lambda: np.zeros(40, dtype=np.uint8))
+        self.assertEqual(cache.stats.entries, 2)
+        self.assertEqual(cache.stats.size, 80)
+        cache.get(('/node', 0, 'read', (9, )),
+                  lambda: np.zeros(200, dtype=np.uint8))
+        self.assertEqual(cache.stats.entries, 2)
+
+        cache.invalidate('/node')
+        self.assertEqual(cache.stats.entries, 0)
+        self.assertEqual(cache.stats.size, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping import codecs
+from pytables_mapping.consts import DEFAULT_DATA_FILTER
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+EVENTS_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('code', np.int64),
+    ('kind', 'S8'),
+    ('value', np.float64)])
+
+EVENTS_LENGTH = 100
+EVENTS = np.empty(EVENTS_LENGTH, dtype=EVENTS_DTYPE)
+EVENTS['timestamp'] = 1600000000000 + np.arange(EVENTS_LENGTH) * 250
+EVENTS['code'] = np.arange(EVENTS_LENGTH) % 7
+EVENTS['kind'] = [(b'buy', b'sell', b'hold')[i % 3]
+                  for i in range(EVENTS_LENGTH)]
+EVENTS['value'] = np.linspace(0, 1, EVENTS_LENGTH)
+
+CODES_DTYPE = np.dtype([('code', np.int64), ('kind', 'S8')])
+CODES = EVENTS[['code', 'kind']].astype(CODES_DTYPE)
+
+
+class EventsTable(mapping.Table):
+
+    FULL_NODE_PATH = TEST_TABLE_PATH
+    OBJECT_NAME = 'events'
+    DESCRIPTION = EVENTS_DTYPE
+    FILTERS = DEFAULT_DATA_FILTER
+    COLUMN_CODECS = {
+        'timestamp': codecs.Delta(np.int16, block=16, shuffle='byte'),
+        'code': codecs.Downcast(0, 100, shuffle='bit'),
+        'kind': codecs.Dictionary(),
+    }
+
+
+class TestCodecsStore(mapping.HDF5Store):
+
+    events = EventsTable()
+    codes = mapping.Table(
+        'codes', TEST_TABLE_PATH,
+        description=CODES_DTYPE,
+        column_codecs={'code': codecs.Downcast(0, 100),
+                       'kind': codecs.Dictionary(size=8)})
+    ticks = mapping.Table(
+        'ticks', TEST_TABLE_PATH,
+        description=EVENTS_DTYPE, primary_key='timestamp',
+        column_codecs={'timestamp': codecs.Delta(np.int16, block=16)})
+
+
+class CodecsTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_CODECS_FILE_NAME
+
+    def test_codecs(self) -> None:
+        with TestCodecsStore(self.TEST_FILE_NAME, mode='w') as store:
+            node = store.events.node
+            assert node is not None
+            self.assertEqual(node.dtype['timestamp'], np.int16)
+            self.assertEqual(node.dtype['code'], np.uint8)
+            self.assertEqual(node.dtype['kind'], np.uint8)
+            self.assertTrue(node.filters.bitshuffle)
+
+            store.events.append(EVENTS[:37])
+            store.events.append(EVENTS[37:])
+            self.assertEqual(store.events.dtype, EVENTS_DTYPE)
+            assert_array_equal(store.events.read(), EVENTS)
+
+        with TestCodecsStore(self.TEST_FILE_NAME, mode='a') as store:
+            assert_array_equal(store.events.read(21, 60), EVENTS[21:60])
+            assert_array_equal(store.events.read(5, 90, 7), EVENTS[5:90:7])
+            assert_array_equal(store.events.read(33, 50, field='timestamp'),
+                               EVENTS['timestamp'][33:50])
+            self.assertEqual(store.events[45], EVENTS[45])
+            assert_array_equal(store.events[np.array([3, 40, 99])],
+                               EVENTS[[3, 40, 99]])
+            self.assertEqual(store.events[-1], EVENTS[-1])
+            assert_array_equal(store.events[np.array([-100, 5])],
+                               EVENTS[[0, 5]])
+            assert_array_equal(store.events[EVENTS['code'] == 2],
+                               EVENTS[EVENTS['code'] == 2])
+            assert_array_equal(store.events[np.array([], dtype=int)],
+                               EVENTS[:0])
+            with self.assertRaises(IndexError):
+                store.events[EVENTS_LENGTH]
+            with self.assertRaises(IndexError):
+                store.events[np.array([0, -EVENTS_LENGTH - 1])]
+            assert_array_equal(store.events.read_where('code == 3'),
+                               EVENTS[EVENTS['code'] == 3])
+            assert_array_equal(
+                store.events.read_where('value > 0.5', field='timestamp'),
+                EVENTS['timestamp'][EVENTS['value'] > 0.5])
+            with self.assertRaises(ValueError):
+                store.events.read_where("kind == b'buy'")
+            with self.assertRaises(ValueError):
+                store.events.read_where('(code > 1) & (timestamp > 0)')
+
+            store.events.append(EVENTS[:1])
+            self.assertEqual(store.events[EVENTS_LENGTH], EVENTS[0])
+
+    def test_update(self) -> None:
+        with TestCodecsStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.codes.append(CODES)
+            row = CODES[10].copy()
+            row['kind'] = b'short'
+            row['code'] = 99
+            store.codes[10] = row
+            self.assertEqual(tuple(store.codes[10]), (99, b'short'))
+            store.codes[:2] = np.array([(5, b'long'), (6, b'buy')],
+                                       dtype=CODES_DTYPE)
+            assert_array_equal(store.codes.read(0, 3, field='kind'),
+                               [b'long', b'buy', b'hold'])
+            with self.assertRaises(ValueError):
+                store.codes.append(np.array(
+                    [(1, b'a'), (2, b'b'), (3, b'c'), (4, b'd')],
+                    dtype=CODES_DTYPE))
+
+    def test_update_delta(self) -> None:
+        with TestCodecsStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.ticks.append(EVENTS[:60])
+            records = EVENTS[40:].copy()
+            records['value'] = -1
+            store.ticks.upsert(records)
+            expected = EVENTS.copy()
+            expected['value'][40:] = -1
+            assert_array_equal(store.ticks.read(), expected)
+
+            store.ticks[20:22] = EVENTS[20:22]
+            expected[20:22] = EVENTS[20:22]
+            assert_array_equal(store.ticks.read(), expected)
+            changed = EVENTS[30].copy()
+            changed['timestamp'] += 1
+            with self.assertRaises(ValueError):
+                store.ticks[30] = changed
+            assert_array_equal(store.ticks.read(), expected)
+
+    def test_errors(self) -> None:
+        with TestCodecsStore(self.TEST_FILE_NAME, mode='w') as store:
+            wrong = EVENTS[:2].copy()
+            wrong['code'] = 1000
+            with self.assertRaises(ValueError):
+                store.events.append(wrong)
+
+            wrong = EVENTS[:2].copy()
+            wrong['timestamp'][1] += 10 ** 6
+            with self.assertRaises(ValueError):
+                store.events.append(wrong)
+
+            # a rejected batch leaves no anchors and dictionary values
+            wrong = EVENTS[:2].copy()
+            wrong['timestamp'] = 500
+            wrong['kind'] = b'unknown'
+            wrong['code'] = 99, 101
+            with self.assertRaises(ValueError):
+                store.events.append(wrong)
+
+            store.events.append(EVENTS)
+            assert_array_equal(store.events.read(), EVENTS)
+            assert_array_equal(store.events.read(20, 60), EVENTS[20:60])
+            self.assertNotIn(b'unknown', codecs.Dictionary().dictionary(
+                store.events, 'kind'))
+            store.events[3] = EVENTS[3]
+            wrong = EVENTS[3].copy()
+            wrong['timestamp'] -= 1
+            with self.assertRaises(ValueError):
+                store.events[3] = wrong
+            assert_array_equal(store.events.read(), EVENTS)
+
+            store.events.remove()
+            self.assertFalse(
+                store.events.node_path + '_timestamp_anchors' in
+                store._hdf_store)
+
+        with self.assertRaises(ValueError):
+            codecs.storage_dtype(EVENTS_DTYPE, {'unknown': codecs.Delta()})
+        with self.assertRaises(ValueError):
+            codecs.shuffled_filters(None, {'code': codecs.Downcast(
+                0, 100, shuffle='bit')})
+
+
+if __name__ == '__main__':
+    unittest.main()
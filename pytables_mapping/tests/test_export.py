@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import importlib.util
+import os
+import unittest
+
+from numpy.testing import assert_array_equal
+
+from pytables_mapping import export
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+from pytables_mapping.tests.test_table import PythagoreanTriplesTable
+import pytables_mapping as mapping
+
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestExportStore(mapping.HDF5Store):
+
+    table = PythagoreanTriplesTable(chunkshape=7)
+    earray = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0, 2),
+                            chunkshape=(4, 2))
+    vlarray = mapping.VLArray(TEST_VLARRAY_OBJECT_NAME, '/arrays',
+                              atom=TEST_ANY_ARRAY_ATOM)
+
+
+class ExportTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_EXPORT_FILE_NAME
+
+    def setUp(self) -> None:
+        super().setUp()
+        with TestExportStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.table.append(TEST_TABLE)
+            store.earray.append(TEST_ANY_ARRAY[:8].reshape(4, 2))
+            store.earray.append(TEST_ANY_ARRAY[:8].reshape(4, 2))
+            store.vlarray.append(TEST_ANY_ARRAY)
+            store.vlarray.append(TEST_ANY_ARRAY[:2])
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        if os.path.isfile(TEST_EXPORT_ARROW_FILE_NAME):
+            os.remove(TEST_EXPORT_ARROW_FILE_NAME)
+
+    def test_shared_memory(self) -> None:
+        with TestExportStore(self.TEST_FILE_NAME) as store:
+            for mapper in (store.table, store.earray):
+                segment, info = export.to_shared_memory(mapper)
+                try:
+                    attached, data = export.attach_shared_memory(info)
+                    assert_array_equal(data, mapper.read())
+                    self.assertEqual(data.dtype, info.dtype)
+                    del data
+                    attached.close()
+                finally:
+                    segment.close()
+                    segment.unlink()
+
+            with self.assertRaises(TypeError):
+                export.to_shared_memory(store.vlarray)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_arrow_ipc(self) -> None:
+        import pyarrow as pa
+
+        with TestExportStore(self.TEST_FILE_NAME) as store:
+            rows = export.to_arrow_ipc(store.table,
+                                       TEST_EXPORT_ARROW_FILE_NAME)
+            self.assertEqual(rows, TEST_TABLE_LENGTH)
+            with pa.memory_map(TEST_EXPORT_ARROW_FILE_NAME) as source:
+                table = pa.ipc.open_file(source).read_all()
+                self.assertEqual(table.column_names, ['A', 'B', 'C'])
+                self.assertEqual(table.schema.field('A').type, pa.int64())
+                assert_array_equal(table.column('C').to_numpy(),
+                                   TEST_TABLE[:, 2])
+
+            sink = pa.BufferOutputStream()
+            export.to_arrow_ipc(store.earray, sink, stream=True)
+            table = pa.ipc.open_stream(sink.getvalue()).read_all()
+            self.assertEqual(table.num_rows, 8)
+            self.assertEqual(table.schema.field(0).type,
+                             pa.list_(pa.int32(), 2))
+
+            sink = pa.BufferOutputStream()
+            export.to_arrow_ipc(store.vlarray, sink, stream=True)
+            table = pa.ipc.open_stream(sink.getvalue()).read_all()
+            self.assertEqual(table.column(0).to_pylist()[1],
+                             TEST_ANY_ARRAY_AS_LIST[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
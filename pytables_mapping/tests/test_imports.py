@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import textwrap
+import unittest
+
+
+def _run_python(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(code)],
+        check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _import_time(module: str, repeat: int = 3) -> float:
+    return min(float(_run_python(f'''
+        import time
+        started = time.perf_counter()
+        import {module}
+        print(time.perf_counter() - started)
+        ''')) for _ in range(repeat))
+
+
+class LazyImportTestCase(unittest.TestCase):
+
+    def test_lazy_import(self) -> None:
+        output = _run_python('''
+            import sys
+
+            import pytables_mapping as mapping
+
+            class SomeTable(mapping.Table):
+                FULL_NODE_PATH = '/some'
+                OBJECT_NAME = 'table'
+
+            class SomeStore(mapping.HDF5Store):
+                table = SomeTable()
+
+            print('tables' in sys.modules, 'numpy' in sys.modules)
+            from pytables_mapping.consts import DEFAULT_DATA_FILTER
+            print('tables' in sys.modules)
+            ''')
+        self.assertEqual(output.split(), ['False', 'False', 'True'])
+
+    def test_import_time(self) -> None:
+        package_time = _import_time('pytables_mapping')
+        tables_time = _import_time('tables')
+        self.assertLess(package_time, tables_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
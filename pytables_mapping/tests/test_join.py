@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import typing as ty
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping.join import join
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+EVENTS_DTYPE = np.dtype([('id', np.int64), ('user', np.int32),
+                         ('amount', np.float64)])
+USERS_DTYPE = np.dtype([('user_id', np.int64), ('name', 'S8'),
+                        ('age', np.int16)])
+JOINED_DTYPE = np.dtype([('id', np.int64), ('amount', np.float64),
+                         ('name', 'S8')])
+
+EVENTS_LENGTH = 1000
+EVENTS = np.empty(EVENTS_LENGTH, dtype=EVENTS_DTYPE)
+EVENTS['id'] = np.arange(EVENTS_LENGTH)
+EVENTS['user'] = np.random.RandomState(3).randint(0, 60, EVENTS_LENGTH)
+EVENTS['amount'] = np.arange(EVENTS_LENGTH) / 8
+
+# users 0-49 except multiples of 7, user 5 is duplicated
+USER_IDS = [user for user in range(50) if user % 7] + [5]
+USERS = np.array([(user, b'user%d' % user, user % 90) for user in USER_IDS],
+                 dtype=USERS_DTYPE)
+
+
+class TestJoinStore(mapping.HDF5Store):
+
+    events = mapping.Table('events', '/join', description=EVENTS_DTYPE)
+    users = mapping.Table('users', '/join', description=USERS_DTYPE)
+    joined = mapping.Table('joined', '/join', description=JOINED_DTYPE)
+
+
+def _expected(how: str) -> np.ndarray:
+    rows = []
+    for event in EVENTS:
+        names = [user['name'] for user in USERS
+                 if user['user_id'] == event['user']]
+        if not names and how == 'left':
+            names = [b'']
+        rows += [(event['id'], event['amount'], name) for name in names]
+    return np.array(rows, dtype=JOINED_DTYPE)
+
+
+class JoinTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_JOIN_FILE_NAME
+
+    def _join(self, store: TestJoinStore, **options: ty.Any) -> np.ndarray:
+        store.joined.remove()
+        store.joined.create()
+        rows = join(store.events, store.users, store.joined,
+                    on=('user', 'user_id'), columns=['name'], chunk_size=128,
+                    **options)
+        data = store.joined.read()
+        self.assertEqual(rows, len(data))
+        return data[np.lexsort((data['name'], data['id']))]
+
+    def test_join(self) -> None:
+        with TestJoinStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.events.append(EVENTS)
+            store.users.append(USERS)
+            for how in ('inner', 'left'):
+                expected = _expected(how)
+                assert_array_equal(self._join(store, how=how), expected)
+                assert_array_equal(
+                    self._join(store, how=how, memory_limit=100), expected)
+
+            data = self._join(store, how='left')
+            self.assertEqual(store.joined.nrows, len(data))
+            assert_array_equal(store.joined.read()['id'],
+                               np.sort(store.joined.read()['id']))
+
+    def test_build_left(self) -> None:
+        with TestJoinStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.events.append(EVENTS[:20])
+            store.users.append(USERS)
+            rows = join(store.events, store.users, store.joined,
+                        on=('user', 'user_id'), columns=['name'],
+                        memory_limit=64)
+            data = store.joined.read()
+            self.assertEqual(rows, len(data))
+            expected = _expected('inner')
+            expected = expected[expected['id'] < 20]
+            assert_array_equal(
+                data[np.lexsort((data['name'], data['id']))], expected)
+
+            with self.assertRaises(ValueError):
+                join(store.events, store.users, store.joined, on='user',
+                     how='outer')
+            with self.assertRaises(ValueError):
+                join(store.users, store.events, store.joined,
+                     on=('user_id', 'user'), columns=['amount'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import os
+import unittest
+import unittest.mock
+
+from pytables_mapping import consts
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+from pytables_mapping.tests.test_table import PythagoreanTriplesTable
+import pytables_mapping as mapping
+
+
+class TestJournalStore(mapping.HDF5Store):
+
+    JOURNAL = True
+
+    table = PythagoreanTriplesTable()
+    earray = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0,))
+    strings = mapping.VLArray('strings', '/arrays', atom=tb.VLStringAtom())
+
+
+class JournalTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_JOURNAL_FILE_NAME
+    JOURNAL_FILE_NAME = TEST_JOURNAL_FILE_NAME + consts.DEFAULT_JOURNAL_SUFFIX
+    REJECTED_FILE_NAME = JOURNAL_FILE_NAME + consts.REJECTED_JOURNAL_SUFFIX
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        for filename in (self.JOURNAL_FILE_NAME, self.REJECTED_FILE_NAME):
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def test_commit(self) -> None:
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            assert store.journal
+            store.table.append(TEST_TABLE)
+            store.earray.append(TEST_ANY_ARRAY)
+            self.assertEqual(store.table.nrows, 0)
+            self.assertTrue(store.journal.pending_size > 0)
+            store.flush()
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, TEST_ANY_ARRAY_LENGTH)
+            self.assertEqual(store.journal.pending_size, 0)
+
+        self.assertFalse(os.path.isfile(self.JOURNAL_FILE_NAME))
+        with TestJournalStore(self.TEST_FILE_NAME, mode='a') as store:
+            store.table.append(TEST_TABLE)
+
+        with TestJournalStore(self.TEST_FILE_NAME) as store:
+            self.assertIsNone(store.journal)
+            self.assertEqual(store.table.nrows, 2 * TEST_TABLE_LENGTH)
+
+    def test_replay(self) -> None:
+        store = TestJournalStore(self.TEST_FILE_NAME, mode='w')
+        store.table.append(TEST_TABLE)
+        store.earray.append(TEST_ANY_ARRAY)
+        store.earray.append(TEST_ANY_ARRAY)
+        # simulate a crash: the h5-file is closed without a journal commit
+        store._hdf_store.close()
+        assert store.journal
+        store.journal._file.close()
+        with open(self.JOURNAL_FILE_NAME, 'ab') as journal_file:
+            journal_file.write(b'torn record')
+
+        with TestJournalStore(self.TEST_FILE_NAME, mode='a') as store:
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, 2 * TEST_ANY_ARRAY_LENGTH)
+            self.assertEqual(tuple(store.table[0]), tuple(TEST_TABLE[0]))
+
+        with TestJournalStore(self.TEST_FILE_NAME, mode='a') as store:
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+
+    def test_replay_after_failed_commit(self) -> None:
+        store = TestJournalStore(self.TEST_FILE_NAME, mode='w')
+        store.table.append(TEST_TABLE)
+        store.earray.append(TEST_ANY_ARRAY)
+        store.earray.append(TEST_ANY_ARRAY)
+        # the second record fails, the first one is applied
+        with unittest.mock.patch.object(store.earray, '_append_rows',
+                                        side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                store.flush()
+        self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+        store._hdf_store.close()
+        assert store.journal
+        store.journal._file.close()
+
+        with TestJournalStore(self.TEST_FILE_NAME, mode='a') as store:
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, 2 * TEST_ANY_ARRAY_LENGTH)
+
+    def test_commit_after_failed_commit(self) -> None:
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.table.append(TEST_TABLE)
+            store.earray.append(TEST_ANY_ARRAY)
+            with unittest.mock.patch.object(store.earray, '_append_rows',
+                                            side_effect=OSError('disk full')):
+                with self.assertRaises(OSError):
+                    store.flush()
+            store.flush()
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, TEST_ANY_ARRAY_LENGTH)
+
+    def test_reused_buffer(self) -> None:
+        buffer = TEST_TABLE.copy()
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.table.append(buffer)
+            buffer[:] = TEST_TABLE[::-1]
+            store.table.append(buffer)
+            buffer[:] = 0
+            store.flush()
+            self.assertEqual(tuple(store.table[0]), tuple(TEST_TABLE[0]))
+            self.assertEqual(tuple(store.table[-1]), tuple(TEST_TABLE[0]))
+
+    def test_rejected_replay(self) -> None:
+        store = TestJournalStore(self.TEST_FILE_NAME, mode='w')
+        store.table.append(TEST_TABLE)
+        store.earray.append(TEST_ANY_ARRAY)
+        store._hdf_store.close()
+        assert store.journal
+        store.journal._file.close()
+
+        with unittest.mock.patch.object(TestJournalStore.earray,
+                                        '_append_rows',
+                                        side_effect=OSError('bad record')):
+            with self.assertWarns(UserWarning):
+                store = TestJournalStore(self.TEST_FILE_NAME, mode='a')
+        with store:
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, 0)
+        self.assertTrue(os.path.isfile(self.REJECTED_FILE_NAME))
+
+        with TestJournalStore(self.TEST_FILE_NAME, mode='a') as store:
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+            self.assertEqual(store.earray.nrows, 0)
+
+    def test_failed_open(self) -> None:
+        with unittest.mock.patch.object(TestJournalStore, '_reset',
+                                        side_effect=OSError('failed')):
+            with self.assertRaises(OSError):
+                TestJournalStore(self.TEST_FILE_NAME, mode='w')
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            self.assertEqual(store.table.nrows, 0)
+
+    def test_variable_length(self) -> None:
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.strings.append(b'variable length')
+            self.assertEqual(store.strings.read(), [b'variable length'])
+            with self.assertRaises(ValueError):
+                store.earray.append(TEST_ANY_ARRAY.astype(object))
+
+    def test_commit_size(self) -> None:
+        with TestJournalStore(self.TEST_FILE_NAME, mode='w') as store:
+            assert store.journal
+            store.journal._commit_size = TEST_TABLE.nbytes
+            store.table.append(TEST_TABLE)
+            self.assertEqual(store.table.nrows, TEST_TABLE_LENGTH)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import os
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping import consts
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+ACCOUNTS_DTYPE = np.dtype([('id', np.int64), ('login', 'S8'),
+                           ('balance', np.float64)])
+ACCOUNTS_LENGTH = 500
+ACCOUNTS = np.empty(ACCOUNTS_LENGTH, dtype=ACCOUNTS_DTYPE)
+ACCOUNTS['id'] = np.random.RandomState(7).permutation(ACCOUNTS_LENGTH) * 3
+ACCOUNTS['login'] = [b'user%d' % i for i in range(ACCOUNTS_LENGTH)]
+ACCOUNTS['balance'] = np.arange(ACCOUNTS_LENGTH) / 4
+
+
+class AccountsTable(mapping.Table):
+
+    FULL_NODE_PATH = TEST_TABLE_PATH
+    OBJECT_NAME = 'accounts'
+    DESCRIPTION = ACCOUNTS_DTYPE
+    PRIMARY_KEY = 'id'
+    CHUNKSHAPE = 16
+
+
+class TestKeysStore(mapping.HDF5Store):
+
+    accounts = AccountsTable()
+    logins = mapping.Table('logins', TEST_TABLE_PATH,
+                           description=ACCOUNTS_DTYPE, primary_key='login')
+
+
+class KeysTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_KEYS_FILE_NAME
+
+    def test_get_many(self) -> None:
+        with TestKeysStore(self.TEST_FILE_NAME, mode='w') as store:
+            for start in range(0, ACCOUNTS_LENGTH, 120):
+                store.accounts.append(ACCOUNTS[start:start + 120])
+            key_index = store.accounts.key_index
+            assert key_index is not None
+            index = key_index.index(store.accounts)
+            runs = key_index._runs(index)
+            self.assertEqual([stop - start for start, stop in runs],
+                             [360, 120, 20])
+            for start, stop in runs:
+                keys = index.read(start, stop, field='key')
+                self.assertTrue((np.diff(keys) > 0).all())
+            assert_array_equal(np.sort(index.col('key')),
+                               np.sort(ACCOUNTS['id']))
+
+        with TestKeysStore(self.TEST_FILE_NAME) as store:
+            keys = ACCOUNTS['id'][[10, 3, 499, 250]]
+            assert_array_equal(store.accounts.get_many(keys),
+                               ACCOUNTS[[10, 3, 499, 250]])
+            assert_array_equal(store.accounts.lookup([ACCOUNTS['id'][7], 1]),
+                               [7, -1])
+            with self.assertRaises(KeyError):
+                store.accounts.get_many([1, ACCOUNTS['id'][0]])
+            assert_array_equal(
+                store.accounts.get_many([1, ACCOUNTS['id'][0]],
+                                        skip_missing=True),
+                ACCOUNTS[:1])
+            assert_array_equal(store.accounts.get_many(ACCOUNTS['id']),
+                               ACCOUNTS)
+
+    def test_increasing_keys(self) -> None:
+        with TestKeysStore(self.TEST_FILE_NAME, mode='w') as store:
+            records = np.sort(ACCOUNTS, order='id')
+            for start in range(0, ACCOUNTS_LENGTH, 50):
+                store.accounts.append(records[start:start + 50])
+            key_index = store.accounts.key_index
+            assert key_index is not None
+            index = key_index.index(store.accounts)
+            self.assertEqual(key_index._runs(index), [(0, ACCOUNTS_LENGTH)])
+            assert_array_equal(store.accounts.lookup(records['id'][::-1]),
+                               np.arange(ACCOUNTS_LENGTH)[::-1])
+
+    def test_upsert(self) -> None:
+        with TestKeysStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.logins.upsert(ACCOUNTS[:300])
+            records = ACCOUNTS[250:400].copy()
+            records['balance'] = -1
+            store.logins.upsert(records)
+            self.assertEqual(store.logins.nrows, 400)
+
+            expected = ACCOUNTS[:400].copy()
+            expected['balance'][250:] = -1
+            assert_array_equal(store.logins.read(), expected)
+            assert_array_equal(
+                store.logins.get_many([b'user399', b'user5']),
+                expected[[399, 5]])
+
+            with self.assertRaises(ValueError):
+                store.logins.append(ACCOUNTS[10:11])
+            with self.assertRaises(ValueError):
+                store.logins.append(ACCOUNTS[[450, 450]])
+            with self.assertRaises(ValueError):
+                store.logins[3] = ACCOUNTS[4]
+            self.assertEqual(store.logins.nrows, 400)
+
+            store.logins.remove()
+            self.assertFalse(store.logins.node_path + '_pk' in
+                             store._hdf_store)
+            with self.assertRaises(ValueError):
+                mapping.Table('plain', TEST_TABLE_PATH).lookup([1])
+
+    def test_journal(self) -> None:
+        with TestKeysStore(self.TEST_FILE_NAME, mode='w',
+                           journal=True) as store:
+            store.accounts.append(ACCOUNTS[:100])
+            with self.assertRaises(ValueError):
+                store.accounts.append(ACCOUNTS[50:150])
+            store.flush()
+            store.accounts.append(ACCOUNTS[100:200])
+            with self.assertRaises(ValueError):
+                store.accounts.append(ACCOUNTS[[10, 300]])
+        journal_file = self.TEST_FILE_NAME + consts.DEFAULT_JOURNAL_SUFFIX
+        self.assertFalse(os.path.isfile(journal_file))
+
+        with TestKeysStore(self.TEST_FILE_NAME, mode='a',
+                           journal=True) as store:
+            assert_array_equal(store.accounts.read(), ACCOUNTS[:200])
+
+    def test_journal_upsert(self) -> None:
+        records = ACCOUNTS[:3].copy()
+        records['balance'] = -1
+        with TestKeysStore(self.TEST_FILE_NAME, mode='w',
+                           journal=True) as store:
+            store.accounts.append(ACCOUNTS[:2])
+            store.accounts.upsert(records[1:])
+            with self.assertRaises(ValueError):
+                store.accounts.upsert(records[[0, 2, 2]])
+            store.flush()
+
+        with TestKeysStore(self.TEST_FILE_NAME, mode='a',
+                           journal=True) as store:
+            expected = ACCOUNTS[:3].copy()
+            expected['balance'][1:] = -1
+            assert_array_equal(store.accounts.read(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import glob
+import importlib.util
+import os
+import typing as ty
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping import loader
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+from pytables_mapping.tests.test_table import PythagoreanTriplesTable
+import pytables_mapping as mapping
+
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestLoaderStore(mapping.HDF5Store):
+
+    table = PythagoreanTriplesTable()
+    earray = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0, 3))
+
+
+class LoaderTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_LOADER_FILE_NAME
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        for name in glob.glob(TEST_LOADER_SOURCE_NAME + '.*'):
+            os.remove(name)
+
+    def assert_loaded(self, source: str, **options: ty.Any) -> None:
+        stats: ty.List[loader.LoadStats] = []
+        with TestLoaderStore(self.TEST_FILE_NAME, mode='w') as store:
+            result = loader.bulk_load(store.table, source, chunk_size=7,
+                                      progress=stats.append, **options)
+            self.assertEqual(result.rows, TEST_TABLE_LENGTH)
+            self.assertEqual(len(stats), 5)
+            self.assertEqual(stats[-1].rows, TEST_TABLE_LENGTH)
+            data = store.table.read()
+            for index, name in enumerate(('A', 'B', 'C')):
+                assert_array_equal(data[name], TEST_TABLE[:, index])
+
+    def test_npy(self) -> None:
+        source = TEST_LOADER_SOURCE_NAME + '.npy'
+        np.save(source, TEST_TABLE)
+        self.assert_loaded(source)
+
+        with TestLoaderStore(self.TEST_FILE_NAME, mode='w') as store:
+            loader.bulk_load(store.earray, source, chunk_size=7)
+            assert_array_equal(store.earray.read(), TEST_TABLE)
+
+    def test_npz(self) -> None:
+        source = TEST_LOADER_SOURCE_NAME + '.npz'
+        np.savez(source, C=TEST_TABLE[:, 2], A=TEST_TABLE[:, 0],
+                 B=TEST_TABLE[:, 1])
+        self.assert_loaded(source)
+
+        np.savez_compressed(source, rows=TEST_TABLE, other=TEST_TABLE[:1])
+        with TestLoaderStore(self.TEST_FILE_NAME, mode='w') as store:
+            loader.bulk_load(store.earray, source, chunk_size=7, key='rows',
+                             processes=2)
+            assert_array_equal(store.earray.read(), TEST_TABLE)
+
+        np.savez(source, rows=np.asfortranarray(TEST_TABLE))
+        with TestLoaderStore(self.TEST_FILE_NAME, mode='w') as store:
+            loader.bulk_load(store.earray, source, chunk_size=7)
+            assert_array_equal(store.earray.read(), TEST_TABLE)
+
+    def test_csv(self) -> None:
+        source = TEST_LOADER_SOURCE_NAME + '.csv'
+        np.savetxt(source, TEST_TABLE, fmt='%d', delimiter=';',
+                   header='A;B;C')
+        self.assert_loaded(source, delimiter=';')
+        self.assert_loaded(source, delimiter=';', processes=2)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        source = TEST_LOADER_SOURCE_NAME + '.parquet'
+        pq.write_table(pa.table({'A': TEST_TABLE[:, 0],
+                                 'B': TEST_TABLE[:, 1],
+                                 'C': TEST_TABLE[:, 2]}), source)
+        self.assert_loaded(source)
+
+    def test_unknown_format(self) -> None:
+        with TestLoaderStore(self.TEST_FILE_NAME, mode='w') as store:
+            with self.assertRaises(ValueError):
+                loader.bulk_load(store.table, 'source.txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import unittest
+import unittest.mock
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping import merge
+from pytables_mapping.merge import merge_stores
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+EVENTS_DTYPE = np.dtype([('ts', np.int64), ('value', np.float64)])
+SOURCES_COUNT = 3
+SOURCE_LENGTH = 250
+
+
+def _events(number: int) -> np.ndarray:
+    events = np.empty(SOURCE_LENGTH, dtype=EVENTS_DTYPE)
+    events['ts'] = np.sort(np.random.RandomState(number).randint(
+        0, 1000, SOURCE_LENGTH))
+    events['value'] = number
+    return events
+
+
+class TestMergeStore(mapping.HDF5Store):
+
+    events = mapping.Table('events', '/merge', description=EVENTS_DTYPE)
+    values = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/merge',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0, 3))
+
+
+class OtherMergeStore(mapping.HDF5Store):
+
+    events = mapping.Table('events', '/merge',
+                           description=np.dtype([('ts', np.int32)]))
+
+
+class MergeTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_MERGE_FILE_NAME
+    SOURCES = [TEST_MERGE_SOURCE_NAME.format(number)
+               for number in range(SOURCES_COUNT)]
+
+    def setUp(self) -> None:
+        super().setUp()
+        for number, path in enumerate(self.SOURCES):
+            with TestMergeStore(path, mode='w') as store:
+                store.events.append(_events(number))
+                store.values.append(
+                    np.full((number + 1, 3), number, TEST_ANY_ARRAY_DTYPE))
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        for path in self.SOURCES:
+            if os.path.isfile(path):
+                os.remove(path)
+
+    def test_concatenate(self) -> None:
+        for processes in (0, 2):
+            rows = merge_stores(self.SOURCES, self.TEST_FILE_NAME,
+                                TestMergeStore, processes=processes,
+                                chunk_size=64)
+            self.assertEqual(rows, {'events': 3 * SOURCE_LENGTH,
+                                    'values': 6})
+            with TestMergeStore(self.TEST_FILE_NAME) as store:
+                assert_array_equal(
+                    store.events.read(),
+                    np.concatenate([_events(number)
+                                    for number in range(SOURCES_COUNT)]))
+                assert_array_equal(store.values.read()[:, 0],
+                                   [0, 1, 1, 2, 2, 2])
+
+    def test_merge_sorted(self) -> None:
+        merge_stores(self.SOURCES, self.TEST_FILE_NAME, TestMergeStore,
+                     processes=2, chunk_size=64, sort_by={'events': 'ts'})
+        expected = np.concatenate([_events(number)
+                                   for number in range(SOURCES_COUNT)])
+        expected = expected[np.argsort(expected['ts'], kind='stable')]
+        with TestMergeStore(self.TEST_FILE_NAME) as store:
+            assert_array_equal(store.events.read(), expected)
+
+        with TestMergeStore(self.SOURCES[1], mode='a') as store:
+            store.events.append(_events(1)[:1])
+        with self.assertRaises(ValueError):
+            merge_stores(self.SOURCES, self.TEST_FILE_NAME, TestMergeStore,
+                         chunk_size=64, sort_by={'events': 'ts'})
+
+    def test_source_reader(self) -> None:
+        reader = merge._SourceReader()
+        with unittest.mock.patch.object(merge, 'MAX_OPEN_SOURCES', 2):
+            for path in self.SOURCES:
+                rows = reader.read((TestMergeStore, path, 'events', 0, 10,
+                                    False))
+                self.assertEqual(len(rows), 10)
+            self.assertEqual([path for _, path in reader._stores],
+                             self.SOURCES[1:])
+            reader.read((TestMergeStore, self.SOURCES[2], 'events', 10,
+                         SOURCE_LENGTH, True))
+            self.assertEqual([path for _, path in reader._stores],
+                             self.SOURCES[1:2])
+        reader.close()
+        self.assertFalse(reader._stores)
+
+    def test_errors(self) -> None:
+        with OtherMergeStore(self.SOURCES[2], mode='w'):
+            pass
+        with self.assertRaises(ValueError):
+            merge_stores(self.SOURCES, self.TEST_FILE_NAME, TestMergeStore)
+        with self.assertRaises(ValueError):
+            merge_stores(self.SOURCES[:2], self.TEST_FILE_NAME,
+                         TestMergeStore, sort_by={'unknown': 'ts'})
+
+
+if __name__ == '__main__':
+    unittest.main()
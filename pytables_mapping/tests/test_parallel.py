@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import multiprocessing
+import typing as ty
+import unittest
+
+from pytables_mapping.parallel import imap_bounded
+
+
+def _square(value: int) -> int:
+    return value * value
+
+
+class ImapBoundedTestCase(unittest.TestCase):
+
+    def test_order(self) -> None:
+        self.assertEqual(list(imap_bounded(None, _square, range(5), 2)),
+                         [0, 1, 4, 9, 16])
+        with multiprocessing.Pool(2) as pool:
+            self.assertEqual(list(imap_bounded(pool, _square, range(50), 3)),
+                             [value * value for value in range(50)])
+
+    def test_window(self) -> None:
+        consumed: ty.List[int] = []
+
+        def tasks() -> ty.Iterator[int]:
+            for value in range(100):
+                consumed.append(value)
+                yield value
+
+        with multiprocessing.Pool(2) as pool:
+            results = imap_bounded(pool, _square, tasks(), 4)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(len(consumed), 5)
+            self.assertEqual(next(results), 1)
+            self.assertEqual(len(consumed), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import unittest
+import warnings
+
+from numpy.testing import assert_array_equal
+import tables as tb
+
+from pytables_mapping.profiles import PROFILES
+from pytables_mapping.profiles import StoreProfile
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+class TestProfilesStore(mapping.HDF5Store):
+
+    PROFILE = 'random-read'
+    STORE_VERSION = 2
+
+    earray = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0,))
+
+
+class ProfilesTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_PROFILES_FILE_NAME
+
+    def tearDown(self) -> None:
+        tb.set_blosc_max_threads(tb.parameters.MAX_BLOSC_THREADS)
+        super().tearDown()
+
+    def test_profiles(self) -> None:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            TestProfilesStore(self.TEST_FILE_NAME, mode='w').close()
+
+        with TestProfilesStore(self.TEST_FILE_NAME, mode='w') as store:
+            self.assertIs(store.profile, PROFILES['random-read'])
+            params = store._hdf_store.params
+            self.assertEqual(params['CHUNK_CACHE_SIZE'], 64 * 1024 * 1024)
+            self.assertEqual(params['NODE_CACHE_SLOTS'], 256)
+            store.earray.append(TEST_ANY_ARRAY)
+
+            store.reopen(self.TEST_FILE_NAME, mode='a',
+                         profile=StoreProfile(chunk_cache_size=1024,
+                                              blosc_threads=2))
+            self.assertEqual(store.attrs.STORE_VERSION, 2)
+            self.assertEqual(store._hdf_store.params['CHUNK_CACHE_SIZE'],
+                             1024)
+            self.assertEqual(store._hdf_store.params['NODE_CACHE_SLOTS'],
+                             tb.parameters.NODE_CACHE_SLOTS)
+            self.assertEqual(tb.set_blosc_max_threads(1), 2)
+
+        with TestProfilesStore(self.TEST_FILE_NAME, mode='a',
+                               profile='in-memory') as store:
+            self.assertEqual(store._hdf_store.params['DRIVER'], 'H5FD_CORE')
+            assert_array_equal(store.earray.read(), TEST_ANY_ARRAY)
+            store.earray.append(TEST_ANY_ARRAY)
+            self.assertEqual(store.earray.nrows, 2 * TEST_ANY_ARRAY_LENGTH)
+
+        self.assertTrue(os.path.isfile(self.TEST_FILE_NAME))
+        with TestProfilesStore(self.TEST_FILE_NAME,
+                               profile='sequential-scan') as store:
+            self.assertEqual(store.earray.nrows, 2 * TEST_ANY_ARRAY_LENGTH)
+
+        with self.assertRaises(ValueError):
+            TestProfilesStore(self.TEST_FILE_NAME, profile='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
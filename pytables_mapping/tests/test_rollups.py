@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import typing as ty
+import unittest
+
+from numpy.testing import assert_allclose
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping.rollups import Rollups
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+TICKS_DTYPE = np.dtype([('timestamp', np.int64), ('price', np.float64),
+                        ('side', 'S4')])
+TICKS_LENGTH = 1234
+TICKS = np.empty(TICKS_LENGTH, dtype=TICKS_DTYPE)
+TICKS['timestamp'] = np.arange(TICKS_LENGTH) * 10
+TICKS['price'] = np.sin(np.arange(TICKS_LENGTH) / 50.0)
+TICKS['side'] = b'buy'
+
+
+class TicksTable(mapping.Table):
+
+    FULL_NODE_PATH = '/ticks'
+    OBJECT_NAME = 'ticks'
+    DESCRIPTION = TICKS_DTYPE
+    ROLLUPS = Rollups(factors=(10, 100))
+
+
+class TestRollupsStore(mapping.HDF5Store):
+
+    ticks = TicksTable()
+    values = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/arrays',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0,),
+                            rollups=Rollups(factors=(4, ),
+                                            stats=('min', 'max')))
+    plain = mapping.EArray('plain', '/arrays', atom=TEST_ANY_ARRAY_ATOM,
+                           shape=(0,))
+    keyed = mapping.Table('keyed', '/ticks', description=TICKS_DTYPE,
+                          primary_key='timestamp',
+                          rollups=Rollups(factors=(10, 100)))
+
+
+def _expected(values: np.ndarray, factor: int) -> ty.Dict[str, ty.Any]:
+    buckets = [values[start:start + factor]
+               for start in range(0, len(values), factor)]
+    return {
+        'min': [bucket.min() for bucket in buckets],
+        'max': [bucket.max() for bucket in buckets],
+        'mean': [bucket.mean() for bucket in buckets],
+        'count': [len(bucket) for bucket in buckets],
+    }
+
+
+class RollupsTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_ROLLUPS_FILE_NAME
+
+    def test_table_rollups(self) -> None:
+        with TestRollupsStore(self.TEST_FILE_NAME, mode='w') as store:
+            for start, stop in ((0, 7), (7, 150), (150, 151),
+                                (151, TICKS_LENGTH)):
+                store.ticks.append(TICKS[start:stop])
+
+        with TestRollupsStore(self.TEST_FILE_NAME) as store:
+            data = store.ticks.read_downsampled(max_points=20)
+            self.assertEqual(len(data), 13)
+            assert_array_equal(data['row'], np.arange(13) * 100)
+            expected = _expected(TICKS['price'], 100)
+            assert_allclose(data['price_min'], expected['min'])
+            assert_allclose(data['price_max'], expected['max'])
+            assert_allclose(data['price_mean'], expected['mean'])
+            assert_array_equal(data['count'], expected['count'])
+            self.assertNotIn('side_min', data.dtype.names)
+
+            data = store.ticks.read_downsampled(100, 300, max_points=50)
+            assert_array_equal(data['row'], np.arange(10, 30) * 10)
+            assert_allclose(data['timestamp_mean'],
+                            _expected(TICKS['timestamp'], 10)['mean'][10:30])
+
+            data = store.ticks.read_downsampled(5, 15, max_points=50)
+            assert_array_equal(data['price_mean'], TICKS['price'][5:15])
+            assert_array_equal(data['count'], 1)
+
+    def test_updated_rows(self) -> None:
+        with TestRollupsStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.keyed.append(TICKS)
+            row = np.array([(0, 1000.0, b'sell')], dtype=TICKS_DTYPE)
+            store.keyed.upsert(row)
+            prices = TICKS['price'].copy()
+            prices[0] = 1000
+            data = store.keyed.read_downsampled(max_points=20)
+            self.assertEqual(data['price_max'][0], 1000)
+            assert_allclose(data['price_mean'],
+                            _expected(prices, 100)['mean'])
+
+            coords = np.array([150, 420, 421])
+            rows = TICKS[coords]
+            rows['price'] = -5, 3, 7
+            store.keyed[coords] = rows
+            prices[coords] = rows['price']
+            data = store.keyed.read_downsampled(max_points=200)
+            expected = _expected(prices, 10)
+            assert_allclose(data['price_min'], expected['min'])
+            assert_allclose(data['price_max'], expected['max'])
+            assert_allclose(data['price_mean'], expected['mean'])
+            assert_array_equal(data['count'], expected['count'])
+
+    def test_earray_rollups(self) -> None:
+        with TestRollupsStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.values.append(TEST_ANY_ARRAY)
+            store.values.append(TEST_ANY_ARRAY)
+            data = store.values.read_downsampled(max_points=5)
+            values = np.concatenate([TEST_ANY_ARRAY, TEST_ANY_ARRAY])
+            expected = _expected(values, 4)
+            self.assertEqual(data.dtype.names, ('row', 'min', 'max'))
+            assert_array_equal(data['min'], expected['min'])
+            assert_array_equal(data['max'], expected['max'])
+
+            store.values[5] = 1000
+            store.values.write_tile((0, ), np.zeros(len(values)))
+            store.values[-1] = -1
+            data = store.values.read_downsampled(max_points=5)
+            values[:] = 0
+            values[-1] = -1
+            expected = _expected(values, 4)
+            assert_array_equal(data['min'], expected['min'])
+            assert_array_equal(data['max'], expected['max'])
+
+            store.values.remove()
+            self.assertNotIn('/arrays/earray_rollup_4', store._hdf_store)
+            store.plain.append(TEST_ANY_ARRAY)
+            with self.assertRaises(ValueError):
+                store.plain.read_downsampled()
+
+
+if __name__ == '__main__':
+    unittest.main()
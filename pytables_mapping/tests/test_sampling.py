@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+ROWS_DTYPE = np.dtype([('id', np.int64), ('group', 'S1'),
+                       ('value', np.float32)])
+ROWS_LENGTH = 10000
+ROWS = np.empty(ROWS_LENGTH, dtype=ROWS_DTYPE)
+ROWS['id'] = np.arange(ROWS_LENGTH)
+ROWS['group'] = np.random.RandomState(5).choice(
+    [b'a', b'b', b'c'], ROWS_LENGTH, p=[0.5, 0.3, 0.2])
+ROWS['value'] = np.arange(ROWS_LENGTH) / 3
+
+
+class TestSamplingStore(mapping.HDF5Store):
+
+    rows = mapping.Table('rows', '/sampling', description=ROWS_DTYPE,
+                         chunkshape=100)
+    values = mapping.EArray(TEST_EARRAY_OBJECT_NAME, '/sampling',
+                            atom=TEST_ANY_ARRAY_ATOM, shape=(0, 2),
+                            chunkshape=(64, 2))
+
+
+class SamplingTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_SAMPLING_FILE_NAME
+
+    def test_exact(self) -> None:
+        with TestSamplingStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.rows.append(ROWS)
+            data = store.rows.sample(500, seed=1)
+            self.assertEqual(len(np.unique(data['id'])), 500)
+            assert_array_equal(data, ROWS[data['id']])
+            self.assertTrue((np.diff(data['id']) > 0).all())
+            assert_array_equal(store.rows.sample(500, seed=1), data)
+            self.assertFalse(
+                np.array_equal(store.rows.sample(500, seed=2), data))
+            assert_array_equal(store.rows.sample(ROWS_LENGTH + 1), ROWS)
+
+            data = store.rows.sample(1000, seed=3, stratify='group')
+            assert_array_equal(data, ROWS[data['id']])
+            self.assertEqual(len(np.unique(data['id'])), 1000)
+            groups, counts = np.unique(ROWS['group'], return_counts=True)
+            sampled = [np.count_nonzero(data['group'] == group)
+                       for group in groups]
+            self.assertTrue(
+                (np.abs(np.array(sampled) - counts / 10) <= 1).all())
+
+            with self.assertRaises(ValueError):
+                store.rows.sample(10, strategy='reservoir')
+            with self.assertRaises(ValueError):
+                store.rows.sample(10, stratify='unknown')
+
+    def test_empty(self) -> None:
+        with TestSamplingStore(self.TEST_FILE_NAME, mode='w') as store:
+            for strategy in ('exact', 'chunks'):
+                data = store.rows.sample(10, strategy=strategy,
+                                         stratify='group')
+                self.assertEqual(data.dtype, ROWS_DTYPE)
+                self.assertEqual(len(data), 0)
+
+    def test_chunks(self) -> None:
+        with TestSamplingStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.rows.append(ROWS)
+            data = store.rows.sample(250, seed=4, strategy='chunks')
+            self.assertEqual(len(data), 250)
+            assert_array_equal(data, ROWS[data['id']])
+            self.assertEqual(len(np.unique(data['id'] // 100)), 3)
+            assert_array_equal(
+                store.rows.sample(250, seed=4, strategy='chunks'), data)
+
+            data = store.rows.sample(250, seed=4, strategy='chunks',
+                                     stratify='group')
+            self.assertEqual(len(data), 250)
+            self.assertEqual(set(data['group']), {b'a', b'b', b'c'})
+
+            values = np.arange(1000, dtype=TEST_ANY_ARRAY_DTYPE)
+            store.values.append(values.reshape(-1, 2))
+            data = store.values.sample(100, seed=5, strategy='chunks')
+            self.assertEqual(data.shape, (100, 2))
+            assert_array_equal(data[:, 1], data[:, 0] + 1)
+            data = store.values.sample(30, seed=5)
+            self.assertEqual(len(np.unique(data[:, 0])), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
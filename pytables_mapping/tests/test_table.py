@@ -71,6 +71,33 @@ class TableMappingTestCase(CustomTestCase):
             store.semi_primes.append(TEST_TABLE)
             self.assertEqual(store.semi_primes.nrows, TEST_TABLE_LENGTH)
 
+    def test_tail(self) -> None:
+        with TestTableStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.semi_primes.append(TEST_TABLE[:10])
+            batches = list(store.semi_primes.tail(consumer='test',
+                                                  chunk_size=4))
+            self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+            self.assertEqual(store.semi_primes.get_tail_offset('test'), 10)
+
+            store.semi_primes.append(TEST_TABLE[10:])
+            tail = store.semi_primes.tail(consumer='test', chunk_size=4)
+            self.assertEqual(tuple(next(tail)[0]), tuple(TEST_TABLE[10]))
+            tail.close()
+            self.assertEqual(store.semi_primes.get_tail_offset('test'), 10)
+
+        with TestTableStore(self.TEST_FILE_NAME, mode='a') as store:
+            rows = sum(len(batch) for batch in
+                       store.semi_primes.tail(consumer='test'))
+            self.assertEqual(rows, TEST_TABLE_LENGTH - 10)
+            self.assertEqual(list(store.semi_primes.tail(consumer='test')),
+                             [])
+            self.assertEqual(len(list(store.semi_primes.tail(from_row=0))),
+                             1)
+
+        unbound = PythagoreanTriplesTable()
+        self.assertEqual(list(unbound.tail(consumer='test')), [])
+        self.assertEqual(unbound.get_tail_offset('test'), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import unittest
+
+from numpy.testing import assert_array_equal
+import numpy as np
+import tables as tb
+
+from pytables_mapping.tests.consts import *
+from pytables_mapping.tests.test_store import CustomTestCase
+import pytables_mapping as mapping
+
+
+GRID = np.arange(50 * 37, dtype=np.float32).reshape(50, 37)
+CUBE = np.arange(22 * 6 * 5, dtype=np.int32).reshape(22, 6, 5)
+
+
+class TestTilesStore(mapping.HDF5Store):
+
+    grid = mapping.CArray('grid', '/tiles', atom=tb.Float32Atom(),
+                          shape=GRID.shape, chunkshape=(8, 10))
+    cube = mapping.EArray('cube', '/tiles', atom=tb.Int32Atom(),
+                          shape=(0, 6, 5), chunkshape=(4, 3, 5))
+
+
+class TilesTestCase(CustomTestCase):
+
+    TEST_FILE_NAME = TEST_TILES_FILE_NAME
+
+    def test_tiles(self) -> None:
+        with TestTilesStore(self.TEST_FILE_NAME, mode='w') as store:
+            self.assertEqual(store.grid.tile_grid(), (7, 4))
+            self.assertEqual(store.grid.tile_grid((16, 20)), (4, 2))
+            for idx in np.ndindex(*store.grid.tile_grid((16, 20))):
+                rows, columns = idx[0] * 16, idx[1] * 20
+                store.grid.write_tile(
+                    idx, GRID[rows:rows + 16, columns:columns + 20],
+                    (16, 20))
+            assert_array_equal(store.grid.read(), GRID)
+
+            tiles = dict(store.grid.iter_tiles())
+            self.assertEqual(len(tiles), 28)
+            assert_array_equal(tiles[(6, 3)], GRID[48:, 30:])
+            assert_array_equal(store.grid.read_tile((2, 1)),
+                               GRID[16:24, 10:20])
+
+            with self.assertRaises(ValueError):
+                store.grid.iter_tiles((10, 10)).__next__()
+            with self.assertRaises(IndexError):
+                store.grid.read_tile((7, 0))
+            with self.assertRaises(ValueError):
+                store.grid.write_tile((0, 0), GRID[:4, :4])
+
+    def test_read_region(self) -> None:
+        with TestTilesStore(self.TEST_FILE_NAME, mode='w') as store:
+            store.grid[:] = GRID
+            store.cube.append(CUBE)
+            assert_array_equal(
+                store.grid.read_region((slice(5, 29), slice(3, 34))),
+                GRID[5:29, 3:34])
+            assert_array_equal(store.grid.read_region((slice(45, None), )),
+                               GRID[45:])
+            out = np.zeros((3, 2, 5), dtype=np.int32)
+            self.assertIs(
+                store.cube.read_region((slice(3, 6), slice(2, 4)), out),
+                out)
+            assert_array_equal(out, CUBE[3:6, 2:4])
+            self.assertEqual(store.cube.tile_grid(), (6, 2, 1))
+            assert_array_equal(store.cube.read_tile((5, 1, 0)),
+                               CUBE[20:, 3:])
+            with self.assertRaises(ValueError):
+                store.grid.read_region((slice(0, 10, 2), ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -35,6 +35,9 @@ setup(
         'numpy',
         'tables'
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+    },
     keywords=['pytables', 'mapping', 'h5', 'hdf5'],
     python_requires='>=3.6',
     zip_safe=False,